@@ -1,6 +1,8 @@
 # Home.py
 import streamlit as st
 
+from weather.warmup import warm_up
+
 # ------------------------------
 # 🏠 HOME PAGE - Main navigation hub
 # ------------------------------
@@ -20,6 +22,9 @@ with col2:
     if st.button("☀️ Go to Weather"):
         st.switch_page("pages/2_Weather.py")
 
+# preload the weather page's heavy libraries while the user is on the home page
+warm_up()
+
 st.divider()
 st.markdown(
     """
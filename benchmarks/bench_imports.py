@@ -0,0 +1,115 @@
+# benchmarks/bench_imports.py
+# ------------------------------
+# 🚀 Startup cost of the weather page: an `-X importtime` breakdown of its
+# module-level imports, and the cold first render (fresh interpreter,
+# imports + first AppTest run). Each is measured twice: as the page is
+# now (heavy libraries load on demand) and "eager", with the heavy
+# libraries preloaded the way the page used to import them up front.
+#
+#   python benchmarks/bench_imports.py [--runs 3] [--out imports.json]
+# ------------------------------
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "pages", "2_Weather.py")
+sys.path.insert(0, ROOT)
+
+from weather.warmup import HEAVY_MODULES
+
+REPORTED = ("streamlit", "numpy", "pandas", "matplotlib", "folium", "geopy", "gtts", "requests")
+
+
+def page_imports(path=PAGE):
+    # the page's module-level imports, read from its source
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def _run(code, env_extra=None, importtime=False):
+    env = dict(os.environ, PYTHONPATH=ROOT, WEATHER_WARMUP="0", **(env_extra or {}))
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return proc.stdout, proc.stderr
+
+
+def _parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package"
+    top_level = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  "):  # top-level import
+            name = name.strip()
+            top_level[name] = int(cumulative)
+            total += int(cumulative)
+    return total, top_level
+
+
+def import_profile(modules):
+    code = (
+        "import json, sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(json.dumps(sorted(m for m in {list(REPORTED)!r} if m in sys.modules)))\n"
+    )
+    stdout, stderr = _run(code, importtime=True)
+    total, top = _parse_importtime(stderr)
+    return {
+        "total_ms": round(total / 1000, 1),
+        "loaded": json.loads(stdout.strip().splitlines()[-1]),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in sorted(top.items(), key=lambda kv: -kv[1])[:8]},
+    }
+
+
+def first_render(preload, runs):
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        + "".join(f"import {m}\n" for m in preload)
+        + "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({PAGE!r}, default_timeout=120).run()\n"
+        "assert not at.exception, [e.value for e in at.exception]\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    times = [float(_run(code)[0].strip().splitlines()[-1]) for _ in range(runs)]
+    return {"median_s": round(statistics.median(times), 3), "min_s": round(min(times), 3), "runs": runs}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import and cold first-render cost of the weather page.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    modules = page_imports()
+    eager = modules + [m for m in HEAVY_MODULES if m not in modules]
+    lazy_render = first_render([], args.runs)
+    eager_render = first_render(HEAVY_MODULES, args.runs)
+    report = {
+        "page_imports": modules,
+        "imports": {"lazy": import_profile(modules), "eager": import_profile(eager)},
+        "first_render": {"lazy": lazy_render, "eager": eager_render},
+        "first_render_saved_s": round(eager_render["median_s"] - lazy_render["median_s"], 3),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
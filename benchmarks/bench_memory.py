@@ -0,0 +1,85 @@
+# benchmarks/bench_memory.py
+# ------------------------------
+# 📏 Memory per city-forecast: per-city pandas DataFrames (what the fetch
+# layer parses), the one-row stores the fetch layer returns and the shared
+# forecast cache keeps, and the compact columnar ForecastStore kept in
+# session.
+#
+#   python benchmarks/bench_memory.py --cities 1000 [--out memory.json]
+# ------------------------------
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather.api import _build_forecast
+from weather.store import ForecastStore
+
+
+def synthetic_response(i, hours=168, days=7):
+    day0 = 1 + i % 20
+    times = [f"2026-10-{day0 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)]
+    return {
+        "current_weather": {"temperature": 20.5 + i % 7, "windspeed": 3.2, "weathercode": i % 4, "time": times[10]},
+        "hourly": {
+            "time": times,
+            "temperature_2m": [15.0 + (h + i) % 12 * 0.5 for h in range(hours)],
+            "relativehumidity_2m": [40 + (h * 7 + i) % 50 for h in range(hours)],
+            "windspeed_10m": [1.0 + (h + i) % 9 * 0.3 for h in range(hours)],
+            "weathercode": [(h + i) % 4 for h in range(hours)],
+        },
+        "daily": {
+            "time": [f"2026-10-{day0 + d:02d}" for d in range(days)],
+            "temperature_2m_max": [22.0 + d for d in range(days)],
+            "temperature_2m_min": [12.0 + d for d in range(days)],
+            "precipitation_sum": [0.1 * d for d in range(days)],
+            "weathercode": [d % 4 for d in range(days)],
+        },
+    }
+
+
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return obj, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare forecast memory: DataFrames vs cached one-row stores vs ForecastStore.")
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    responses = [synthetic_response(i) for i in range(args.cities)]
+    frames, frames_bytes = retained_bytes(lambda: [_build_forecast(js) for js in responses])
+    deep = sum(f["hourly"].memory_usage(deep=True).sum() + f["daily"].memory_usage(deep=True).sum() for f in frames)
+    cached, cached_bytes = retained_bytes(lambda: [ForecastStore.from_forecasts([f]).city(0) for f in frames])
+    store, store_bytes = retained_bytes(lambda: ForecastStore.from_forecasts(frames))
+
+    report = {
+        "cities": args.cities,
+        "dataframes": {"retained_bytes": frames_bytes, "deep_bytes": int(deep), "bytes_per_city": frames_bytes // args.cities},
+        "cache": {"retained_bytes": cached_bytes, "bytes_per_city": cached_bytes // args.cities},
+        "store": {"retained_bytes": store_bytes, "array_bytes": store.nbytes, "bytes_per_city": store_bytes // args.cities},
+        "ratio": round(frames_bytes / max(1, store_bytes), 1),
+        "cache_ratio": round(frames_bytes / max(1, cached_bytes), 1),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# benchmarks/bench_suite.py
+# ------------------------------
+# ⏱️ Offline benchmark suite: every upstream is replaced by the local stub
+# server (benchmarks/stub_servers.py), so runs need no network and are
+# comparable between commits.
+#
+#   python benchmarks/bench_suite.py --out bench.json
+#   python benchmarks/bench_suite.py --latency 0.05 --error-rate 0.02 --sizes 1 10 100
+#   python benchmarks/bench_suite.py --compare old.json new.json
+#
+# Measures: end-to-end fetch time for N cities, full-script rerun time of
+# pages/2_Weather.py through Streamlit's AppTest, peak memory per session,
+# and chart / map / voice render time.
+# ------------------------------
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import FALLBACK_PREFIX, StubServer, stub_synthesizer
+
+PAGE = os.path.join(ROOT, "pages", "2_Weather.py")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def city_names(n, run, fallback_every=20):
+    # unique per run, so every measurement starts from cold caches
+    return [
+        f"{FALLBACK_PREFIX} {run}-{i}" if fallback_every and i % fallback_every == fallback_every - 1 else f"Bench City {run}-{i}"
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat=1):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"min_s": round(min(times), 6), "median_s": round(statistics.median(times), 6), "runs": repeat}
+
+# --------------------------
+# End-to-end fetch: geocode (incl. Nominatim fallback) + batched forecasts
+# --------------------------
+def bench_fetch(server, sizes, workers):
+    from weather.pipeline import fetch_cities
+
+    out = {}
+    for n in sizes:
+        server.reset_counts()
+        start = time.perf_counter()
+        results, failed, _ = fetch_cities(city_names(n, f"fetch{n}"), max_workers=workers)
+        elapsed = time.perf_counter() - start
+        out[str(n)] = {
+            "seconds": round(elapsed, 4),
+            "cities_per_second": round(n / elapsed, 1),
+            "ok": len(results),
+            "failed": len(failed),
+            "upstream": server.snapshot_counts(),
+        }
+    return out
+
+# --------------------------
+# Charts, map and voice, each from a cold cache
+# --------------------------
+def bench_render(sizes):
+    from weather import charts, maps, pipeline
+    from weather.charts import comparison_chart, hourly_chart, weekly_chart
+    from weather.maps import map_html
+    from weather.store import ForecastStore
+    from weather.tts import get_tts_cache
+    from weather.viewmodel import build_comparison, build_view, comparison_version, view_frames
+
+    out = {}
+    for n in sizes:
+        results, _, _ = pipeline.fetch_cities(city_names(n, f"render{n}", fallback_every=0))
+        store = ForecastStore.from_forecasts([r["data"] for r in results])
+        for i, r in enumerate(results):
+            r["data"] = store.city(i)
+            r["view"] = build_view(r)
+        r = results[0]
+        frames = view_frames(r["view"], r["data"])
+        comp = build_comparison(results)
+        version = comparison_version(results)
+
+        charts.chart_cache.clear()
+        maps.map_cache.clear()
+        entry = {
+            "hourly_chart": timed(lambda: hourly_chart(r["view"], frames["next24"])),
+            "weekly_chart": timed(lambda: weekly_chart(r["view"], frames["daily"])),
+            "comparison_chart": timed(lambda: comparison_chart(comp, "Temperature", "°C", version)),
+            "map_html": timed(lambda: map_html(results)),
+            "map_html_cached": timed(lambda: map_html(results), repeat=5),
+        }
+        tts = get_tts_cache()
+        text = f"{r['view']['speak_text']} ({n})"
+        entry["voice_clip"] = timed(lambda: tts.get(text))
+        entry["voice_clip_cached"] = timed(lambda: tts.get(text), repeat=5)
+        out[str(n)] = entry
+    return out
+
+# --------------------------
+# Full-script reruns of the weather page, plus peak memory per session
+# --------------------------
+def _apptest():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(PAGE, default_timeout=120)
+
+
+def _session(cities, reruns):
+    at = _apptest()
+    at.run()
+    for box in at.checkbox:
+        if box.label in ("Enable voice (gTTS)", "Auto-refresh watched places"):
+            box.uncheck()
+    at.text_input[0].set_value(", ".join(cities))
+    start = time.perf_counter()
+    next(b for b in at.button if b.label == "Fetch Weather").click().run()
+    fetch_s = time.perf_counter() - start
+    errors = [str(e.value) for e in at.exception]
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return at, fetch_s, times, errors
+
+
+def bench_apptest(cities, reruns, sessions):
+    # warm-up: imports and first-render costs are not what we measure
+    _session(city_names(1, "warm", 0), 0)
+
+    at, fetch_s, times, errors = _session(city_names(cities, "rerun", 0), reruns)
+    result = {
+        "cities": cities,
+        "fetch_click_s": round(fetch_s, 4),
+        "rerun_min_s": round(min(times), 4) if times else None,
+        "rerun_median_s": round(statistics.median(times), 4) if times else None,
+        "reruns": reruns,
+        "errors": errors,
+    }
+    del at
+
+    peaks = []
+    retained = []
+    for k in range(sessions):
+        gc.collect()
+        tracemalloc.start()
+        at, _, _, _ = _session(city_names(cities, f"mem{k}", 0), 1)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        retained.append(current)
+        del at
+    result["memory"] = {
+        "sessions": sessions,
+        "peak_bytes_per_session": int(statistics.median(peaks)) if peaks else None,
+        "retained_bytes_per_session": int(statistics.median(retained)) if retained else None,
+    }
+    return result
+
+# --------------------------
+# Compare two reports: ratio new/old for every timing
+# --------------------------
+def _flatten(node, prefix=""):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, node
+
+
+def compare(old_path, new_path, threshold=1.2):
+    with open(old_path) as fh:
+        old_report = json.load(fh)
+    with open(new_path) as fh:
+        new_report = json.load(fh)
+    if old_report["config"] != new_report["config"]:
+        print("warning: the two reports were run with different settings")
+    old = dict(_flatten(old_report["results"]))
+    new = dict(_flatten(new_report["results"]))
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        if not key.endswith(("_s", "seconds", "_bytes", "bytes_per_session")) or not old[key]:
+            continue
+        ratio = new[key] / old[key]
+        flag = "REGRESSION" if ratio > threshold else ("faster" if ratio < 1 / threshold else "")
+        rows.append(f"{key:70s} {old[key]:>14} {new[key]:>14} {ratio:6.2f}x {flag}")
+    print("\n".join(rows))
+    return any(r.endswith("REGRESSION") for r in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the weather dashboard.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--render-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added by the stub to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses that are 503")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--apptest-cities", type=int, default=10)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=3, help="sessions measured for memory")
+    parser.add_argument("--skip-apptest", action="store_true")
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two reports and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare) else 0)
+
+    server = StubServer(latency=args.latency, error_rate=args.error_rate).start()
+    os.environ.update(server.env())
+    os.environ["WEATHER_CACHE_DIR"] = tempfile.mkdtemp(prefix="weather-bench-")
+    os.environ.pop("WEATHER_GAZETTEER", None)
+
+    # only now import the app: endpoints and cache paths are read at import
+    from weather import tts, warmup
+    # import cost is bench_imports.py's job; measure warm code paths here
+    warmup._preload(warmup.HEAVY_MODULES)
+    tts._shared = tts.TTSCache(os.path.join(os.environ["WEATHER_CACHE_DIR"], "tts"), synthesize=stub_synthesizer(server))
+
+    results = {"fetch": bench_fetch(server, args.sizes, args.workers), "render": bench_render(args.render_sizes)}
+    if not args.skip_apptest:
+        results["apptest"] = bench_apptest(args.apptest_cities, args.reruns, args.sessions)
+    server.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
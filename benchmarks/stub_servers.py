@@ -0,0 +1,210 @@
+# benchmarks/stub_servers.py
+# ------------------------------
+# 🧪 Local stand-ins for every upstream the app talks to (Open-Meteo
+# geocoding + forecast, Nominatim, ipinfo.io, a TTS endpoint), answering
+# canned responses with configurable latency and error rate. One threaded
+# HTTP server serves all of them; `env()` gives the variables that point
+# the weather package at it (set them before importing `weather`).
+#
+#   python benchmarks/stub_servers.py --port 8765 --latency 0.05 --error-rate 0.02
+# ------------------------------
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# names starting with this are unknown to the geocoder, so the Nominatim
+# fallback gets exercised too
+FALLBACK_PREFIX = "Fallback"
+# a few hundred bytes of silent MPEG frames are enough for the cache/join code
+FAKE_MP3 = bytes.fromhex("fffb9064") + bytes(413)
+
+
+def place_for(name):
+    h = int(hashlib.blake2b(name.encode("utf-8"), digest_size=8).hexdigest(), 16)
+    return round(-60 + (h % 12000) / 100, 4), round(-180 + (h // 12000 % 36000) / 100, 4)
+
+
+class StubServer:
+    def __init__(self, port=0, latency=0.0, error_rate=0.0, seed=1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.counts = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self):
+        return {
+            "OPEN_METEO_GEOCODING_URL": f"{self.base}/v1/search",
+            "OPEN_METEO_FORECAST_URL": f"{self.base}/v1/forecast",
+            "IPINFO_URL": f"{self.base}/json",
+            "NOMINATIM_DOMAIN": f"127.0.0.1:{self.port}",
+            "NOMINATIM_SCHEME": "http",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {}
+
+    def snapshot_counts(self):
+        with self._lock:
+            return {route: dict(entry) for route, entry in self.counts.items()}
+
+    def _count(self, route, failed):
+        with self._lock:
+            entry = self.counts.setdefault(route, {"requests": 0, "errors": 0})
+            entry["requests"] += 1
+            entry["errors"] += int(failed)
+
+    def _fail(self):
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+    # --------------------------
+    # Canned responses per route
+    # --------------------------
+    def geocode(self, q):
+        name = q.get("name", [""])[0]
+        if name.startswith(FALLBACK_PREFIX):
+            return {"generationtime_ms": 0.1}
+        lat, lon = place_for(name)
+        return {"results": [{"name": name, "latitude": lat, "longitude": lon, "country": "Benchland"}]}
+
+    def nominatim(self, q):
+        name = q.get("q", [""])[0]
+        lat, lon = place_for(name)
+        return [{
+            "lat": str(lat), "lon": str(lon), "display_name": f"{name}, Benchland",
+            "address": {"country": "Benchland"},
+        }]
+
+    def forecast(self, q):
+        # imported here: bench_memory pulls in weather.api, which reads the
+        # endpoint variables at import time
+        from bench_memory import synthetic_response
+
+        lats = q.get("latitude", [""])[0].split(",")
+        lons = q.get("longitude", [""])[0].split(",")
+        # like Open-Meteo, one bad coordinate rejects the whole request
+        if any(not -90 <= float(la) <= 90 or not -180 <= float(lo) <= 180 for la, lo in zip(lats, lons)):
+            raise ValueError("Latitude must be in range of -90 to 90°. Longitude must be in range of -180 to 180°.")
+        items = [synthetic_response(int(abs(float(lat)) * 100)) for lat in lats]
+        return items[0] if len(items) == 1 else items
+
+    def ipinfo(self, q):
+        return {"city": "Benchville", "region": "Bench", "country": "BL", "loc": "52.5200,13.4050"}
+
+    def _handler(self):
+        stub = self
+        routes = {
+            "/v1/search": ("geocode", stub.geocode),
+            "/v1/forecast": ("forecast", stub.forecast),
+            "/search": ("nominatim", stub.nominatim),
+            "/json": ("ipinfo", stub.ipinfo),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+            def _send(self, status, body, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _serve(self):
+                url = urlsplit(self.path)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if url.path == "/tts":
+                    route, make = "tts", None
+                elif url.path in routes:
+                    route, make = routes[url.path]
+                else:
+                    self._send(404, b"{}")
+                    return
+                failed = stub._fail()
+                stub._count(route, failed)
+                if failed:
+                    self._send(503, b'{"error": true, "reason": "stub error"}')
+                elif make is None:
+                    self._send(200, FAKE_MP3, "audio/mpeg")
+                else:
+                    try:
+                        body = make(parse_qs(url.query))
+                    except ValueError as exc:
+                        self._send(400, json.dumps({"error": True, "reason": str(exc)}).encode("utf-8"))
+                        return
+                    self._send(200, json.dumps(body).encode("utf-8"))
+
+            def do_GET(self):
+                self._serve()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                self._serve()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def stub_synthesizer(server):
+    # stands in for gTTS (whose Google endpoint is not configurable)
+    import requests
+
+    def synthesize(text, lang="en"):
+        r = requests.post(f"{server.base}/tts", data={"text": text, "lang": lang}, timeout=10)
+        r.raise_for_status()
+        return r.content
+
+    return synthesize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve stand-in upstream APIs for local runs and benchmarks.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+    server = StubServer(args.port, args.latency, args.error_rate)
+    for key, value in server.env().items():
+        print(f"export {key}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
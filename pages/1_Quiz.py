@@ -1,52 +1,95 @@
 # pages/1_Quiz.py
 import streamlit as st
 
+from quiz.bank import UNANSWERED, get_bank
+from quiz.scoring import load_tiers, tier_for
+from quiz.submissions import get_submission_store
+
 # ------------------------------
-# 🧠 QUIZ PAGE - 3 question mini quiz
+# 🧠 QUIZ PAGE - questions sampled from the shared question bank
 # ------------------------------
 
 st.set_page_config(page_title="Quiz", page_icon="🧠", layout="centered")
 st.title("🧠 Fun Knowledge Quiz")
-st.markdown("Answer the 3 questions below and test yourself!")
-
-# Define quiz data
-quiz = [
-    {
-        "question": "1️⃣ What is the capital of France?",
-        "options": ["Paris", "London", "Berlin", "Rome"],
-        "answer": "Paris"
-    },
-    {
-        "question": "2️⃣ Who developed Python?",
-        "options": ["Guido van Rossum", "Elon Musk", "Linus Torvalds", "Mark Zuckerberg"],
-        "answer": "Guido van Rossum"
-    },
-    {
-        "question": "3️⃣ What is 5 * 3 + 2?",
-        "options": ["17", "18", "15", "20"],
-        "answer": "17"
-    }
-]
-
-# Store user answers
+
+# one bank per process; sessions only hold question ids and answers
+bank = get_bank()
+submissions = get_submission_store()
+tiers = load_tiers(bank.meta.get("tiers"))
+ANY = "Any"
+MAX_QUESTIONS = 50
+
+
+def new_quiz():
+    st.session_state.pop("quiz_ids", None)
+    st.session_state.pop("quiz_submitted", None)
+
+
+# Quiz settings
+st.sidebar.header("Quiz settings")
+category = st.sidebar.selectbox("Category", [ANY] + bank.categories, on_change=new_quiz)
+difficulty = st.sidebar.selectbox("Difficulty", [ANY] + bank.difficulties, on_change=new_quiz)
+category = None if category == ANY else category
+difficulty = None if difficulty == ANY else difficulty
+available = len(bank.pool(category, difficulty))
+if not available:
+    st.info("No questions match these settings.")
+    st.stop()
+length = st.sidebar.number_input(
+    "Number of questions", min_value=1, max_value=min(MAX_QUESTIONS, available),
+    value=min(3, available), step=1, on_change=new_quiz,
+)
+st.sidebar.button("🔀 New quiz", on_click=new_quiz)
+player = st.sidebar.text_input("Your name (for the leaderboard)", max_chars=40)
+
+if "quiz_ids" not in st.session_state:
+    st.session_state["quiz_ids"] = bank.sample(length, category, difficulty)
+    for key in [k for k in st.session_state if str(k).startswith("quiz_q_")]:
+        del st.session_state[key]
+quiz_ids = st.session_state["quiz_ids"]
+
+st.markdown(f"Answer the {len(quiz_ids)} questions below and test yourself!")
+
+# Store user answers (option indexes)
 user_answers = []
 
-for q in quiz:
-    ans = st.radio(q["question"], q["options"], index=None)
-    user_answers.append(ans)
+for n, qid in enumerate(quiz_ids, start=1):
+    q = bank.question(qid)
+    ans = st.radio(
+        f"{n}. {q['question']}", range(len(q["options"])), index=None,
+        format_func=lambda i, opts=q["options"]: opts[i], key=f"quiz_q_{qid}",
+    )
+    user_answers.append(UNANSWERED if ans is None else ans)
 
 if st.button("✅ Submit"):
-    score = 0
-    for idx, q in enumerate(quiz):
-        if user_answers[idx] == q["answer"]:
-            score += 1
-
-    st.success(f"🎉 You scored {score} / {len(quiz)}")
-    
-    if score == 3:
+    correct = bank.correct(quiz_ids, user_answers)
+    score = int(correct.sum())
+    # one leaderboard entry per quiz; resubmitting only re-scores
+    if not st.session_state.get("quiz_submitted"):
+        submissions.submit(player, quiz_ids, correct)
+        st.session_state["quiz_submitted"] = True
+
+    st.success(f"🎉 You scored {score} / {len(quiz_ids)}")
+
+    tier = tier_for(score, len(quiz_ids), tiers)
+    if tier.celebrate:
         st.balloons()
-        st.markdown("**Excellent! 🌟 You're a genius!**")
-    elif score == 2:
-        st.markdown("**Nice work 👍 Keep learning!**")
+    st.markdown(f"**{tier.message}**")
+
+    # how everyone else did on these questions
+    rates = submissions.question_rates(quiz_ids)
+    for n, (qid, ok) in enumerate(zip(quiz_ids, correct), start=1):
+        if qid in rates:
+            mark = "✅" if ok else f"❌ (answer: {bank.answer_text(qid)})"
+            st.caption(f"{n}. {mark} — {rates[qid]['correct_rate']:.0%} of {rates[qid]['attempts']} attempts correct")
+
+with st.expander("🏆 Leaderboard"):
+    board = submissions.leaderboard()
+    if board:
+        st.table([{"Player": e["player"], "Score": f"{e['score']} / {e['total']}", "%": e["percent"]} for e in board])
     else:
-        st.markdown("**Keep practicing 🤓 You'll get there!**")
+        st.write("No submissions yet — be the first!")
+    dist = submissions.score_distribution(len(quiz_ids))
+    if dist:
+        st.write(f"Score distribution for {len(quiz_ids)}-question quizzes")
+        st.bar_chart({"Players": {str(k): v for k, v in dist.items()}})
@@ -0,0 +1,4 @@
+# quiz/__init__.py
+# ------------------------------
+# 🧠 Quiz engine shared by the Streamlit pages
+# ------------------------------
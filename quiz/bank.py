@@ -0,0 +1,153 @@
+# quiz/bank.py
+import json
+import os
+import random
+import threading
+
+import numpy as np
+
+# --------------------------
+# Question bank: loaded once per process from JSON or Parquet into a few
+# flat arrays shared by every session. Rows are sorted by question id, so
+# ids map to rows with a binary search, and row indexes by category,
+# difficulty and (category, difficulty) make filtered sampling O(N).
+# Sessions keep only the sampled ids and their chosen option indexes.
+# --------------------------
+BANK_PATH = os.environ.get("QUIZ_BANK", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "questions.json"))
+UNANSWERED = -1
+
+
+def _read_records(path):
+    # -> (question records, extra metadata such as score tiers)
+    if path.endswith(".parquet"):
+        import pandas as pd
+
+        df = pd.read_parquet(path)
+        return df.to_dict("records"), {}
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, list):
+        return data, {}
+    return data["questions"], {k: v for k, v in data.items() if k != "questions"}
+
+
+def _codes(values):
+    names = sorted(set(values))
+    lookup = {name: i for i, name in enumerate(names)}
+    return names, np.fromiter((lookup[v] for v in values), dtype=np.int16, count=len(values))
+
+
+def _index(codes, n_names):
+    # code -> sorted array of rows, built with one stable argsort
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(n_names + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(n_names)]
+
+
+class QuestionBank:
+    def __init__(self, records, meta=None):
+        records = sorted(records, key=lambda r: int(r["id"]))
+        n = len(records)
+        self.meta = meta or {}
+        self.ids = np.fromiter((int(r["id"]) for r in records), dtype=np.int64, count=n)
+        if n and np.any(np.diff(self.ids) == 0):
+            raise ValueError("question ids must be unique")
+        self.text = tuple(str(r["question"]) for r in records)
+        # options of all questions in one tuple, sliced by offsets
+        options = [tuple(str(o) for o in r["options"]) for r in records]
+        self.option_text = tuple(o for opts in options for o in opts)
+        self.option_offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum([len(opts) for opts in options], out=self.option_offsets[1:])
+        self.answer = np.empty(n, dtype=np.int8)
+        for i, (r, opts) in enumerate(zip(records, options)):
+            a = r["answer"]
+            if isinstance(a, (int, np.integer)) and not isinstance(a, bool):
+                idx = int(a)
+            elif str(a) in opts:
+                idx = opts.index(str(a))
+            else:
+                raise ValueError(f"question {r['id']}: answer {a!r} is not one of its options")
+            if not 0 <= idx < len(opts):
+                raise ValueError(f"question {r['id']}: answer index {idx} out of range")
+            self.answer[i] = idx
+        self.categories, self.category = _codes([str(r.get("category") or "General") for r in records])
+        self.difficulties, self.difficulty = _codes([str(r.get("difficulty") or "medium") for r in records])
+        self._by_category = _index(self.category, len(self.categories))
+        self._by_difficulty = _index(self.difficulty, len(self.difficulties))
+        pair = self.category.astype(np.int32) * len(self.difficulties) + self.difficulty
+        self._by_pair = _index(pair, len(self.categories) * len(self.difficulties))
+        self._all = np.arange(n, dtype=np.int32)
+        for arr in (self.ids, self.option_offsets, self.answer, self.category, self.difficulty):
+            arr.flags.writeable = False  # shared by every session
+
+    @classmethod
+    def load(cls, path):
+        records, meta = _read_records(path)
+        return cls(records, meta)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def pool(self, category=None, difficulty=None):
+        # rows matching the filters (None = any); no copy is made
+        c = self.categories.index(category) if category is not None else None
+        d = self.difficulties.index(difficulty) if difficulty is not None else None
+        if c is not None and d is not None:
+            return self._by_pair[c * len(self.difficulties) + d]
+        if c is not None:
+            return self._by_category[c]
+        if d is not None:
+            return self._by_difficulty[d]
+        return self._all
+
+    def sample(self, n, category=None, difficulty=None, rng=None):
+        # Floyd's algorithm: n distinct rows in O(n), whatever the pool size
+        rng = rng or random
+        pool = self.pool(category, difficulty)
+        m = len(pool)
+        n = min(int(n), m)
+        picked = set()
+        for j in range(m - n, m):
+            t = rng.randint(0, j)
+            picked.add(j if t in picked else t)
+        rows = list(picked)
+        rng.shuffle(rows)
+        return self.ids[pool[rows]].tolist() if rows else []
+
+    def rows(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, ids)
+        if len(ids) and (np.any(rows >= len(self.ids)) or np.any(self.ids[np.minimum(rows, len(self.ids) - 1)] != ids)):
+            raise KeyError("unknown question id")
+        return rows
+
+    def question(self, qid):
+        row = int(self.rows([qid])[0])
+        lo, hi = self.option_offsets[row], self.option_offsets[row + 1]
+        return {
+            "id": int(self.ids[row]),
+            "question": self.text[row],
+            "options": self.option_text[lo:hi],
+            "category": self.categories[self.category[row]],
+            "difficulty": self.difficulties[self.difficulty[row]],
+        }
+
+    def correct(self, ids, chosen):
+        # vectorized check: chosen option indexes (UNANSWERED for blanks)
+        return self.answer[self.rows(ids)] == np.asarray(chosen, dtype=np.int16)
+
+    def answer_text(self, qid):
+        row = int(self.rows([qid])[0])
+        return self.option_text[self.option_offsets[row] + self.answer[row]]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_bank():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = QuestionBank.load(BANK_PATH)
+        return _shared
@@ -0,0 +1,30 @@
+# quiz/scoring.py
+from collections import namedtuple
+
+# --------------------------
+# Score tiers as fractions of the quiz length, so the same table works
+# for 3 questions or 50. Tiers come from the bank file ("tiers") and fall
+# back to the defaults below; the first tier the score reaches wins.
+# --------------------------
+Tier = namedtuple("Tier", "min_fraction message celebrate")
+
+DEFAULT_TIERS = (
+    Tier(1.0, "Excellent! 🌟 You're a genius!", True),
+    Tier(0.6, "Nice work 👍 Keep learning!", False),
+    Tier(0.0, "Keep practicing 🤓 You'll get there!", False),
+)
+
+
+def load_tiers(config):
+    if not config:
+        return DEFAULT_TIERS
+    tiers = [Tier(float(t["min_fraction"]), str(t["message"]), bool(t.get("celebrate", False))) for t in config]
+    return tuple(sorted(tiers, key=lambda t: t.min_fraction, reverse=True))
+
+
+def tier_for(score, total, tiers=DEFAULT_TIERS):
+    fraction = score / total if total else 0.0
+    for tier in tiers:
+        if fraction >= tier.min_fraction:
+            return tier
+    return tiers[-1]
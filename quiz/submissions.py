@@ -0,0 +1,228 @@
+# quiz/submissions.py
+import atexit
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+
+# --------------------------
+# Quiz submissions: submit() only updates in-memory aggregates and queues
+# the row; a background writer flushes the queue to SQLite (WAL) in
+# batches, together with the running aggregate tables. Leaderboard,
+# per-question correct rates and score distribution are served from
+# memory and restored from those tables on start, never by scanning
+# every submission.
+# --------------------------
+DB_PATH = os.environ.get("QUIZ_DB", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "quiz.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    fraction REAL NOT NULL,
+    created_at REAL NOT NULL,
+    answers TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_rank ON submissions (fraction DESC, score DESC, created_at);
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_id INTEGER PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS score_counts (
+    total INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (total, score)
+);
+"""
+
+
+class SubmissionStore:
+    def __init__(self, path, top_k=10, batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()        # aggregates + queue
+        self._db_lock = threading.Lock()     # the connection (writer thread, flush, close)
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._questions = {}                 # question id -> [attempts, correct]
+        self._scores = {}                    # quiz length -> Counter(score)
+        self._top = []                       # min-heap of (fraction, score, -created_at, player, total)
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "errors": 0}
+        self._db = None
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+            self._db.executescript(SCHEMA)
+            self._restore()
+        except sqlite3.Error:
+            # read-only or missing disk: keep the aggregates in memory only
+            self._db = None
+        self._thread = threading.Thread(target=self._run, name="quiz-submissions", daemon=True)
+        self._thread.start()
+
+    def _restore(self):
+        for qid, attempts, correct in self._db.execute("SELECT question_id, attempts, correct FROM question_stats"):
+            self._questions[qid] = [attempts, correct]
+        for total, score, count in self._db.execute("SELECT total, score, count FROM score_counts"):
+            self._scores.setdefault(total, Counter())[score] = count
+        rows = self._db.execute(
+            "SELECT fraction, score, created_at, player, total FROM submissions ORDER BY fraction DESC, score DESC, created_at LIMIT ?",
+            (self.top_k,),
+        )
+        for fraction, score, created_at, player, total in rows:
+            heapq.heappush(self._top, (fraction, score, -created_at, player, total))
+
+    # --------------------------
+    # Submit path: memory only, O(quiz length + log K)
+    # --------------------------
+    def submit(self, player, question_ids, correct):
+        question_ids = [int(q) for q in question_ids]
+        correct = [bool(c) for c in correct]
+        total = len(question_ids)
+        score = sum(correct)
+        fraction = score / total if total else 0.0
+        now = time.time()
+        player = (player or "").strip()[:40] or "Anonymous"
+        with self._lock:
+            for qid, ok in zip(question_ids, correct):
+                entry = self._questions.setdefault(qid, [0, 0])
+                entry[0] += 1
+                entry[1] += ok
+            self._scores.setdefault(total, Counter())[score] += 1
+            item = (fraction, score, -now, player, total)
+            if len(self._top) < self.top_k:
+                heapq.heappush(self._top, item)
+            elif item > self._top[0]:
+                heapq.heapreplace(self._top, item)
+            self._queue.append((player, score, total, fraction, now, json.dumps([question_ids, correct])))
+            self.stats["submitted"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._wake.set()
+        return score
+
+    # --------------------------
+    # Background writer: one transaction per batch
+    # --------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _take(self):
+        with self._lock:
+            n = min(len(self._queue), self.batch_size)
+            return [self._queue.popleft() for _ in range(n)]
+
+    def flush(self):
+        with self._db_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return
+                if self._db is None:
+                    continue  # memory-only: nothing to persist
+                try:
+                    self._write(batch)
+                except sqlite3.Error:
+                    with self._lock:
+                        # put the batch back in order and retry on the next tick
+                        self._queue.extendleft(reversed(batch))
+                        self.stats["errors"] += 1
+                    return
+                with self._lock:
+                    self.stats["written"] += len(batch)
+                    self.stats["batches"] += 1
+
+    def _write(self, batch):
+        questions = Counter()
+        attempts = Counter()
+        scores = Counter()
+        for _, score, total, _, _, answers in batch:
+            ids, correct = json.loads(answers)
+            attempts.update(ids)
+            questions.update(q for q, ok in zip(ids, correct) if ok)
+            scores[(total, score)] += 1
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT INTO submissions (player, score, total, fraction, created_at, answers) VALUES (?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            db.executemany(
+                "INSERT INTO question_stats (question_id, attempts, correct) VALUES (?, ?, ?) "
+                "ON CONFLICT(question_id) DO UPDATE SET attempts = attempts + excluded.attempts, correct = correct + excluded.correct",
+                [(qid, n, questions[qid]) for qid, n in attempts.items()],
+            )
+            db.executemany(
+                "INSERT INTO score_counts (total, score, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(total, score) DO UPDATE SET count = count + excluded.count",
+                [(total, score, n) for (total, score), n in scores.items()],
+            )
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self.flush()
+
+    # --------------------------
+    # Read-outs, all from memory
+    # --------------------------
+    def leaderboard(self):
+        with self._lock:
+            top = sorted(self._top, reverse=True)
+        return [
+            {"player": player, "score": score, "total": total, "percent": round(100 * fraction, 1), "at": -neg_at}
+            for fraction, score, neg_at, player, total in top
+        ]
+
+    def question_rates(self, question_ids=None):
+        with self._lock:
+            ids = self._questions if question_ids is None else question_ids
+            return {
+                int(q): {"attempts": self._questions[q][0], "correct_rate": self._questions[q][1] / self._questions[q][0]}
+                for q in ids if q in self._questions and self._questions[q][0]
+            }
+
+    def score_distribution(self, total=None):
+        with self._lock:
+            if total is not None:
+                return dict(sorted(self._scores.get(total, {}).items()))
+            return {t: dict(sorted(c.items())) for t, c in sorted(self._scores.items())}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, pending=len(self._queue), questions=len(self._questions), persistent=self._db is not None)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_submission_store():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SubmissionStore(DB_PATH)
+            # write out whatever is still queued when the server exits
+            atexit.register(_shared.close)
+        return _shared
@@ -0,0 +1,52 @@
+# tests/test_export.py
+# ------------------------------
+# --retry-failed: sites that succeed on retry leave failed.csv and the
+# checkpoint's failed set; sites still failing are listed once.
+# ------------------------------
+import csv
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stub_servers import StubServer
+
+from weather import api, export, forecast_cache, httpclient
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer().start()
+    monkeypatch.setattr(api, "FORECAST_URL", server.env()["OPEN_METEO_FORECAST_URL"])
+    monkeypatch.setattr(forecast_cache, "_shared", forecast_cache.ForecastCache())
+    monkeypatch.setattr(httpclient, "backoff_delay", lambda attempt: 0)
+    yield server
+    server.stop()
+
+
+def _failed_sites(out_dir):
+    with open(os.path.join(out_dir, "failed.csv"), newline="", encoding="utf-8") as fh:
+        return [int(row["site"]) for row in csv.DictReader(fh)]
+
+
+def test_retry_failed_drops_sites_that_now_succeed(stub, tmp_path):
+    sites = tmp_path / "sites.csv"
+    sites.write_text("latitude,longitude\n10,20\n11,21\n200,3\n12,22\n")
+    out = str(tmp_path / "out")
+
+    stub.error_rate = 1.0  # every forecast request fails
+    first = export.export(str(sites), out, fmt="csv")
+    assert first["failed"] == 4
+    assert _failed_sites(out) == [0, 1, 2, 3]
+
+    stub.error_rate = 0.0
+    second = export.export(str(sites), out, fmt="csv", retry_failed=True)
+    assert second["ok"] == 3
+    # the out-of-range site still fails, and is listed once
+    assert _failed_sites(out) == [2]
+    header = {"input": str(sites), "tables": list(export.TABLES), "format": "csv"}
+    assert export.Checkpoint(out, header).failed == {2}
@@ -0,0 +1,41 @@
+# tests/test_forecast_chunks.py
+# ------------------------------
+# A bad coordinate fails only its own place, not the rest of its chunk.
+# ------------------------------
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stub_servers import StubServer
+
+from weather import api
+from weather.pipeline import resolve_city
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer().start()
+    monkeypatch.setattr(api, "FORECAST_URL", server.env()["OPEN_METEO_FORECAST_URL"])
+    yield server
+    server.stop()
+
+
+def test_out_of_range_coordinates_are_not_located():
+    assert api.parse_latlon("52.52,13.40")["latitude"] == 52.52
+    assert api.parse_latlon("91,13.40") is None
+    assert api.parse_latlon("52.52,-181") is None
+    assert resolve_city("123.4,5") is None
+
+
+def test_rejected_chunk_is_split_around_the_bad_place(stub):
+    places = [{"latitude": 10 + i, "longitude": 20} for i in range(8)]
+    places[5] = {"latitude": 123.4, "longitude": 20}
+    forecasts = api.fetch_open_meteo_chunk(places)
+    assert [f is None for f in forecasts] == [i == 5 for i in range(8)]
+    # the full chunk, then halves down to the bad place: 1 + 2 + 2 + 2
+    assert stub.snapshot_counts()["forecast"]["requests"] == 7
@@ -0,0 +1,29 @@
+# tests/test_locations.py
+# ------------------------------
+# Bulk CSV input: coordinates with or without a header, and names with
+# an optional country column.
+# ------------------------------
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather.locations import read_locations
+
+
+def _read(text):
+    return list(read_locations(io.StringIO(text)))
+
+
+def test_headerless_coordinates_are_not_names():
+    assert _read("52.5,13.4\n48.8,2.3\n") == ["52.5,13.4", "48.8,2.3"]
+    assert _read("Berlin\nParis\n") == ["Berlin", "Paris"]
+
+
+def test_country_column_is_joined_to_the_name():
+    assert _read("city,country\nParis,FR\nBerlin,\n") == ["Paris, FR", "Berlin"]
+
+
+def test_out_of_range_coordinates_fall_back_to_the_name():
+    assert _read("name,lat,lon\nA,1,2\nB,100,2\n,200,3\n") == ["1.0,2.0", "B", "200.0,3.0"]
@@ -0,0 +1,45 @@
+# tests/test_pipeline.py
+# ------------------------------
+# Dropping the streaming pipeline early (a rerun, Ctrl-C) cancels the
+# queued lookups instead of waiting for every remaining city.
+# ------------------------------
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stub_servers import StubServer
+
+from weather import api, forecast_cache, gazetteer, geocache
+from weather.pipeline import iter_fetch_cities
+
+CITIES = 200
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    server = StubServer(latency=0.2).start()
+    env = server.env()
+    monkeypatch.setattr(api, "GEOCODING_URL", env["OPEN_METEO_GEOCODING_URL"])
+    monkeypatch.setattr(api, "FORECAST_URL", env["OPEN_METEO_FORECAST_URL"])
+    monkeypatch.setattr(geocache, "_shared", geocache.GeoCache(str(tmp_path / "geocode.sqlite")))
+    monkeypatch.setattr(forecast_cache, "_shared", forecast_cache.ForecastCache())
+    monkeypatch.setattr(gazetteer, "_shared", None)
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", "")
+    yield server
+    server.stop()
+
+
+def test_closing_early_cancels_queued_lookups(stub):
+    results = iter_fetch_cities([f"Early Exit {i}" for i in range(CITIES)])
+    next(results)
+    started = time.perf_counter()
+    results.close()
+    assert time.perf_counter() - started < 1.0
+    time.sleep(0.5)  # let the lookups already running land
+    assert stub.snapshot_counts()["geocode"]["requests"] < CITIES
@@ -0,0 +1,59 @@
+# tests/test_singleflight.py
+# ------------------------------
+# Concurrent identical lookups coalesce into one upstream request.
+# Runs the weather pipeline against the local stand-in server.
+# ------------------------------
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stub_servers import StubServer
+
+from weather import api, forecast_cache, gazetteer, geocache
+from weather.pipeline import fetch_cities
+
+CALLERS = 20
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    # slow enough that every caller arrives while the first request is in flight
+    server = StubServer(latency=0.3).start()
+    env = server.env()
+    monkeypatch.setattr(api, "GEOCODING_URL", env["OPEN_METEO_GEOCODING_URL"])
+    monkeypatch.setattr(api, "FORECAST_URL", env["OPEN_METEO_FORECAST_URL"])
+    # cold, private caches and no offline gazetteer
+    monkeypatch.setattr(geocache, "_shared", geocache.GeoCache(str(tmp_path / "geocode.sqlite")))
+    monkeypatch.setattr(forecast_cache, "_shared", forecast_cache.ForecastCache())
+    monkeypatch.setattr(gazetteer, "_shared", None)
+    monkeypatch.setattr(gazetteer, "GAZETTEER_PATH", "")
+    yield server
+    server.stop()
+
+
+def test_concurrent_callers_make_one_upstream_request(stub):
+    barrier = threading.Barrier(CALLERS)
+    outcomes = [None] * CALLERS
+
+    def caller(i):
+        barrier.wait()
+        outcomes[i] = fetch_cities(["Coalesce Town"], max_workers=1)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    for results, failed, _ in outcomes:
+        assert not failed
+        assert results[0]["place"]["name"] == "Coalesce Town"
+    counts = stub.snapshot_counts()
+    assert counts["geocode"]["requests"] == 1
+    assert counts["forecast"]["requests"] == 1
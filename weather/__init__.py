@@ -0,0 +1,4 @@
+# weather/__init__.py
+# ------------------------------
+# 🌦️ Weather helpers shared by the Streamlit pages
+# ------------------------------
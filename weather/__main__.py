@@ -0,0 +1,26 @@
+# weather/__main__.py
+import sys
+
+# --------------------------
+# Command-line entry point:
+#   python -m weather export sites.csv out/ [--format csv] ...
+#   python -m weather gazetteer build|query ...
+# --------------------------
+COMMANDS = {
+    "export": "weather.export",
+    "gazetteer": "weather.gazetteer",
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m weather {{{','.join(COMMANDS)}}} ...", file=sys.stderr)
+        sys.exit(2)
+    import importlib
+
+    importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# weather/api.py
+import os
+import time
+
+from weather import httpclient, metrics
+from weather.forecast_cache import STALE, forecast_key, get_forecast_cache
+from weather.gazetteer import get_gazetteer
+from weather.geocache import MISSING, get_geocache, normalize_query
+from weather.singleflight import forecast_flight, geocode_flight
+
+# Upstream endpoints; override via env to point at a local stand-in server
+GEOCODING_URL = os.environ.get("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+IPINFO_URL = os.environ.get("IPINFO_URL", "https://ipinfo.io/json")
+NOMINATIM_DOMAIN = os.environ.get("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.environ.get("NOMINATIM_SCHEME", "https")
+
+# --------------------------
+# Helpers: geocode via Open-Meteo then fallback to Nominatim
+# --------------------------
+def geocode_city(city, tries=3):
+    city = city.strip()
+    if not city:
+        return None
+    # local gazetteer first (if configured); network only on a miss
+    gaz = get_gazetteer()
+    if gaz is not None:
+        place = gaz.lookup(city)
+        if place:
+            metrics.incr("weather_cache_hits_total", cache="gazetteer")
+            return place
+    cache = get_geocache()
+    cached = cache.get(city)
+    if cached is not MISSING:
+        metrics.incr("weather_cache_hits_total", cache="geocode")
+        return cached
+    metrics.incr("weather_cache_misses_total", cache="geocode")
+
+    def lookup():
+        place, definitive = _geocode_remote(city, tries)
+        # only remember a miss when both providers actually answered
+        if place or definitive:
+            cache.put(city, place)
+        return place
+
+    return geocode_flight.do(normalize_query(city), lookup)
+
+
+_geolocator = None
+
+
+def _nominatim():
+    global _geolocator
+    if _geolocator is None:
+        # geopy is only loaded once a lookup actually falls back to Nominatim
+        from geopy.geocoders import Nominatim
+
+        # one instance, so geopy keeps reusing its pooled session
+        _geolocator = Nominatim(user_agent="weather_dashboard_app", domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+    return _geolocator
+
+
+def _geocode_remote(city, tries):
+    with metrics.span("geocode.open_meteo"):
+        place, definitive = _geocode_open_meteo(city, tries)
+    if place:
+        return place, True
+    with metrics.span("geocode.nominatim"):
+        place, answered = _geocode_nominatim(city, tries)
+    return place, definitive and answered
+
+
+def _geocode_open_meteo(city, tries):
+    # Open-Meteo geocoding (retries/backoff handled by the shared client)
+    try:
+        r = httpclient.get(GEOCODING_URL, params={"name": city, "count": 1, "language": "en"}, timeout=8, retries=tries - 1)
+        if r.status_code == 200:
+            js = r.json()
+            if "results" in js and len(js["results"])>0:
+                res = js["results"][0]
+                return {
+                    "name": res.get("name", city),
+                    "latitude": res.get("latitude"),
+                    "longitude": res.get("longitude"),
+                    "country": res.get("country","")
+                }, True
+            return None, True
+    except Exception:
+        metrics.incr("weather_stage_failures_total", stage="geocode.open_meteo")
+    return None, False
+
+
+def _geocode_nominatim(city, tries):
+    # fallback: geopy Nominatim, paced by the shared 1 req/s bucket
+    try:
+        from geopy.exc import GeocoderServiceError
+
+        geolocator = _nominatim()
+        for attempt in range(tries):
+            httpclient.throttle(NOMINATIM_DOMAIN)
+            try:
+                loc = geolocator.geocode(city, timeout=10, addressdetails=True)
+            except GeocoderServiceError:
+                metrics.incr("weather_upstream_failures_total", host=NOMINATIM_DOMAIN, reason="GeocoderServiceError")
+                if attempt == tries - 1:
+                    raise
+                metrics.incr("weather_upstream_retries_total", host=NOMINATIM_DOMAIN)
+                time.sleep(httpclient.backoff_delay(attempt))
+                continue
+            if loc:
+                country = ""
+                if hasattr(loc, "raw") and isinstance(loc.raw, dict):
+                    country = loc.raw.get("address", {}).get("country", "")
+                return {
+                    "name": getattr(loc, "address", city),
+                    "latitude": loc.latitude,
+                    "longitude": loc.longitude,
+                    "country": country
+                }, True
+            break
+    except Exception:
+        metrics.incr("weather_stage_failures_total", stage="geocode.nominatim")
+        return None, False
+    return None, True
+
+# --------------------------
+# Helper: "lat,lon" direct input
+# --------------------------
+def split_latlon(city):
+    # (lat, lon) when the text is shaped like coordinates, else None
+    if "," in city and all(part.strip().replace('.','',1).replace('-','',1).isdigit() for part in city.split(",")[:2]):
+        return float(city.split(",")[0].strip()), float(city.split(",")[1].strip())
+    return None
+
+
+def valid_latlon(lat, lon):
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+def parse_latlon(city):
+    parts = split_latlon(city)
+    if parts is None or not valid_latlon(*parts):
+        return None
+    lat, lon = parts
+    return {"name": f"{lat:.3f},{lon:.3f}", "latitude": lat, "longitude": lon, "country": ""}
+
+# --------------------------
+# Helpers: Open-Meteo forecast fetch
+# --------------------------
+HOURLY_VARS = "temperature_2m,relativehumidity_2m,windspeed_10m,weathercode"
+DAILY_VARS = "temperature_2m_max,temperature_2m_min,precipitation_sum,weathercode"
+
+
+def _forecast_params(lats, lons, days=7):
+    return {
+        "latitude": ",".join(str(v) for v in lats),
+        "longitude": ",".join(str(v) for v in lons),
+        "hourly": HOURLY_VARS,
+        "daily": DAILY_VARS,
+        "current_weather": "true",
+        "forecast_days": days,
+        "timezone": "auto",
+    }
+
+
+def _build_forecast(js):
+    with metrics.span("forecast.dataframes"):
+        return _forecast_frames(js)
+
+
+def _forecast_frames(js):
+    import pandas as pd
+
+    # build pandas structures
+    current = js.get("current_weather", {})
+    hourly = pd.DataFrame(js.get("hourly", {})) if js.get("hourly") else pd.DataFrame()
+    daily = pd.DataFrame(js.get("daily", {})) if js.get("daily") else pd.DataFrame()
+    if not hourly.empty and "time" in hourly.columns:
+        hourly["time"] = pd.to_datetime(hourly["time"])
+    if not daily.empty and "time" in daily.columns:
+        daily["time"] = pd.to_datetime(daily["time"]).dt.date
+    return {"current": current, "hourly": hourly, "daily": daily}
+
+
+# what the fetch layer hands out and the caches keep: a one-row compact
+# store, not the per-city DataFrames it is built from
+def _compact_forecast(js):
+    from weather.store import ForecastStore
+
+    frames = _build_forecast(js)
+    with metrics.span("forecast.store"):
+        return ForecastStore.from_forecasts([frames]).city(0)
+
+
+def fetch_open_meteo(lat, lon, hours=24, days=7):
+    return fetch_forecasts([{"latitude": lat, "longitude": lon}], days=days)[0]
+
+# --------------------------
+# Helpers: batched Open-Meteo fetch (comma-separated coordinates, one request per chunk)
+# --------------------------
+# Open-Meteo answers 400 for the whole request when any one coordinate is
+# bad; such a chunk is split and the halves retried, so only the bad place
+# fails. Server and network errors are not split: that would only
+# multiply requests to a struggling upstream.
+def fetch_open_meteo_chunk(places, days=7):
+    try:
+        with metrics.span("forecast.fetch"):
+            r = httpclient.get(
+                FORECAST_URL,
+                params=_forecast_params([p["latitude"] for p in places], [p["longitude"] for p in places], days),
+                timeout=12 + len(places) // 10,
+            )
+            rejected = r.status_code == 400
+            js = r.json() if r.status_code == 200 else None
+    except Exception:
+        metrics.incr("weather_stage_failures_total", stage="forecast.fetch")
+        return [None] * len(places)
+    # a single location comes back as an object, several as a list
+    if isinstance(js, dict):
+        js = [js]
+    if js is not None and len(js) == len(places):
+        return [_compact_forecast_or_none(item) for item in js]
+    metrics.incr("weather_stage_failures_total", stage="forecast.fetch")
+    if (rejected or js is not None) and len(places) > 1:
+        half = len(places) // 2
+        return fetch_open_meteo_chunk(places[:half], days) + fetch_open_meteo_chunk(places[half:], days)
+    return [None] * len(places)
+
+
+def _compact_forecast_or_none(item):
+    try:
+        return _compact_forecast(item)
+    except Exception:
+        metrics.incr("weather_stage_failures_total", stage="forecast.dataframes")
+        return None
+
+
+def chunked(items, size):
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fetch_open_meteo_batch(places, chunk_size=50, days=7):
+    out = []
+    for chunk in chunked(places, chunk_size):
+        out.extend(fetch_open_meteo_chunk(chunk, days=days))
+    return out
+
+# --------------------------
+# Helpers: forecasts through the shared cache. Fresh and stale entries
+# are answered from memory (stale ones get refreshed in the background);
+# only misses reach `fetch_chunk`, batched `chunk_size` places at a time.
+# --------------------------
+def forecast_cache_key(place, days=7):
+    return forecast_key(place["latitude"], place["longitude"], HOURLY_VARS, DAILY_VARS, days)
+
+
+def fetch_forecasts(places, days=7, chunk_size=50, fetch_chunk=None):
+    fetch_chunk = fetch_chunk or fetch_open_meteo_chunk
+    cache = get_forecast_cache()
+    keys = [forecast_cache_key(p, days) for p in places]
+    out = [None] * len(places)
+    missing = []
+    stale = {}
+    for i, key in enumerate(keys):
+        value, state = cache.get(key)
+        if value is None:
+            missing.append(i)
+            continue
+        out[i] = value
+        if state == STALE:
+            stale[key] = places[i]
+    metrics.incr("weather_cache_hits_total", len(places) - len(missing), cache="forecast")
+    metrics.incr("weather_cache_misses_total", len(missing), cache="forecast")
+    if stale:
+        def refresh(stale_keys):
+            fresh = []
+            for chunk in chunked(stale_keys, chunk_size):
+                fresh.extend(fetch_chunk([stale[k] for k in chunk], days=days))
+            return fresh
+        cache.refresh_async(list(stale), refresh)
+    # coalesce with identical requests already in flight in other sessions
+    leaders = []
+    followers = []
+    for i in missing:
+        fut, leader = forecast_flight.begin(keys[i])
+        (leaders if leader else followers).append((i, fut))
+    try:
+        for chunk in chunked(leaders, chunk_size):
+            fetched = fetch_chunk([places[i] for i, _ in chunk], days=days)
+            for (i, fut), data in zip(chunk, fetched):
+                out[i] = data
+                if data is not None:
+                    cache.put(keys[i], data)
+                forecast_flight.finish(keys[i], fut, data)
+    except Exception as e:
+        # never leave followers waiting on a flight that will not land
+        for i, fut in leaders:
+            forecast_flight.fail(keys[i], fut, e)
+        raise
+    for i, fut in followers:
+        out[i] = fut.result()
+    return out
+
+# --------------------------
+# Helper: IP-based auto-location (approximate)
+# --------------------------
+def ip_geolocate():
+    try:
+        r = httpclient.get(IPINFO_URL, timeout=6)
+        if r.status_code == 200:
+            js = r.json()
+            loc = js.get("loc")  # "lat,lon"
+            if loc:
+                lat, lon = loc.split(",")
+                return {"latitude": float(lat), "longitude": float(lon), "city": js.get("city",""), "region": js.get("region",""), "country": js.get("country","")}
+    except Exception:
+        pass
+    return None
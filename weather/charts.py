@@ -0,0 +1,67 @@
+# weather/charts.py
+from io import BytesIO
+
+from weather.lru import LRUCache
+
+# --------------------------
+# Chart rendering: each chart is drawn once per (key, data version, chart
+# type) into PNG bytes, kept in a bounded process-wide LRU, and its Figure
+# is discarded straight away, so long-running servers keep a flat RSS.
+# matplotlib itself is imported on the first render, not with the page.
+# --------------------------
+def load_matplotlib():
+    import matplotlib
+    matplotlib.use("Agg")  # headless server: no GUI backend, no pyplot figure registry
+    from matplotlib.figure import Figure
+    return Figure
+
+
+chart_cache = LRUCache(512, max_bytes=64 * 1024 * 1024, sizeof=len, name="chart", span="render.chart")
+
+
+def _to_png(draw, figsize=None):
+    # Figure() is not registered with pyplot, so it is freed as soon as
+    # the last reference goes away; clear() drops the artists eagerly.
+    fig = load_matplotlib()(figsize=figsize)
+    try:
+        draw(fig.subplots())
+        buf = BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def hourly_chart(view, next24):
+    def draw(ax):
+        ax.plot(next24["time"], next24["temperature_2m"], marker="o")
+        ax.set_title(f"Hourly Temp — {view['name']}")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("°C")
+        ax.grid(True, alpha=0.3)
+
+    return chart_cache.get_or_build((view["key"], view["version"], view["hour_start"], "hourly"), lambda: _to_png(draw))
+
+
+def weekly_chart(view, disp):
+    def draw(ax):
+        if "Max °C" in disp.columns:
+            ax.plot(disp["Date"], disp["Max °C"], marker="o", label="Max °C")
+        if "Min °C" in disp.columns:
+            ax.plot(disp["Date"], disp["Min °C"], marker="o", label="Min °C")
+        ax.set_title(f"7-day Temps — {view['name']}")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("°C")
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+    return chart_cache.get_or_build((view["key"], view["version"], "weekly"), lambda: _to_png(draw))
+
+
+def comparison_chart(comp_df, column, ylabel, version):
+    def draw(ax):
+        ax.bar(comp_df["City"], comp_df[column])
+        ax.set_ylabel(ylabel)
+        ax.grid(axis="y", alpha=0.3)
+
+    return chart_cache.get_or_build(("comparison", version, column), lambda: _to_png(draw, figsize=(6, 3)))
@@ -0,0 +1,247 @@
+# weather/export.py
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from weather.forecast_cache import get_forecast_cache
+from weather.locations import read_locations
+from weather.pipeline import iter_fetch_cities
+
+# --------------------------
+# Headless batch export: the same geocode + batched forecast pipeline as
+# the dashboard, for nightly jobs over many sites. Input is streamed and
+# fetched `window` sites at a time; each window is written as one part
+# file per table and then recorded in a checkpoint, so memory stays flat
+# and an interrupted run resumes without refetching completed sites.
+#
+#   python -m weather export sites.csv out/ --format parquet --workers 8
+#
+# out/
+#   hourly/part-00000.parquet ...   one row per site and hour
+#   daily/part-00000.parquet ...    one row per site and day
+#   current/part-00000.parquet ...  one row per site
+#   failed.csv                      sites that could not be located/fetched
+#   _checkpoint.jsonl               header line, then one line per part
+# --------------------------
+TABLES = ("hourly", "daily", "current")
+CHECKPOINT = "_checkpoint.jsonl"
+
+
+class ExportError(Exception):
+    pass
+
+
+def _site_fields(out):
+    p = out["place"]
+    return {
+        "site": out["index"], "query": out["query"], "name": p.get("name"),
+        "country": p.get("country"), "latitude": p.get("latitude"), "longitude": p.get("longitude"),
+    }
+
+
+def _frames(outputs, tables):
+    import pandas as pd
+
+    parts = {t: [] for t in tables}
+    current_rows = []
+    for out in outputs:
+        site = _site_fields(out)
+        data = out["data"]
+        for table in ("hourly", "daily"):
+            if table in parts and data.get(table) is not None and not data[table].empty:
+                df = data[table].copy()
+                for i, (col, value) in enumerate(site.items()):
+                    df.insert(i, col, value)
+                parts[table].append(df)
+        if "current" in parts:
+            current_rows.append(dict(site, **(data.get("current") or {})))
+    frames = {}
+    for table in tables:
+        if table == "current":
+            frames[table] = pd.DataFrame(current_rows) if current_rows else None
+        else:
+            frames[table] = pd.concat(parts[table], ignore_index=True) if parts[table] else None
+    return frames
+
+
+def _write_part(df, directory, part, fmt):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{part:05d}.{fmt}")
+    tmp = path + ".tmp"
+    # write-then-rename: a part file is either complete or absent
+    if fmt == "parquet":
+        try:
+            df.to_parquet(tmp, index=False)
+        except ImportError as e:
+            raise ExportError("Parquet output needs pyarrow (pip install pyarrow), or use --format csv") from e
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+# --------------------------
+# Checkpoint: a header describing the run, then one line per committed
+# part listing the site indices it covers (including failures)
+# --------------------------
+class Checkpoint:
+    def __init__(self, out_dir, header):
+        self.path = os.path.join(out_dir, CHECKPOINT)
+        self.header = header
+        self.done = set()
+        self.failed = set()
+        self.parts = 0
+        if os.path.exists(self.path):
+            self._load()
+        else:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as fh:
+                fh.write(json.dumps({"header": header}) + "\n")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as fh:
+            lines = [json.loads(line) for line in fh if line.strip()]
+        if not lines or lines[0].get("header") != self.header:
+            raise ExportError(f"{self.path} belongs to a different export (input, tables or format differ); use a new output directory")
+        for entry in lines[1:]:
+            self.done.update(entry["done"])
+            self.failed.update(entry["failed"])
+            self.parts = max(self.parts, entry["part"] + 1)
+        # sites retried with --retry-failed may have succeeded since
+        self.failed -= self.done
+
+    def commit(self, part, done, failed):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"part": part, "done": done, "failed": failed}) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self.done.update(done)
+        self.failed.update(failed)
+        self.failed -= self.done
+        self.parts = part + 1
+
+
+def _remove_orphans(out_dir, tables, fmt, parts):
+    # parts written after the last checkpoint line are redone on resume
+    for table in tables:
+        directory = os.path.join(out_dir, table)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(directory, name))
+            elif name.startswith("part-") and name.endswith(f".{fmt}") and int(name[5:10]) >= parts:
+                os.remove(os.path.join(directory, name))
+
+
+def _append_failures(out_dir, rows):
+    path = os.path.join(out_dir, "failed.csv")
+    new = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        if new:
+            writer.writerow(["site", "query", "error"])
+        writer.writerows(rows)
+
+
+def _rewrite_failures(out_dir, still_failing):
+    # keep one row (the latest) per site that is still failing
+    path = os.path.join(out_dir, "failed.csv")
+    if not os.path.exists(path):
+        return
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = {}
+        for row in itertools.islice(csv.reader(fh), 1, None):
+            if row and int(row[0]) in still_failing:
+                rows[int(row[0])] = row
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["site", "query", "error"])
+        writer.writerows(rows[site] for site in sorted(rows))
+    os.replace(tmp, path)
+
+
+def export(source, out_dir, fmt="parquet", tables=TABLES, workers=8, window=500, chunk_size=50, retry_failed=False, log=None):
+    tables = tuple(tables)
+    header = {"input": os.path.abspath(source) if isinstance(source, str) else None, "tables": list(tables), "format": fmt}
+    checkpoint = Checkpoint(out_dir, header)
+    _remove_orphans(out_dir, tables, fmt, checkpoint.parts)
+    skip = checkpoint.done if retry_failed else checkpoint.done | checkpoint.failed
+
+    todo = ((i, q) for i, q in enumerate(read_locations(source)) if i not in skip)
+    totals = {"sites": 0, "ok": 0, "failed": 0, "skipped": len(skip), "parts": 0}
+    started = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(todo, window))
+        if not batch:
+            break
+        index = [i for i, _ in batch]
+        ok, failures = [], []
+        for out in iter_fetch_cities([q for _, q in batch], max_workers=workers, chunk_size=chunk_size):
+            out = dict(out, index=index[out["index"]])
+            if "error" in out:
+                failures.append((out["index"], out["query"], out["error"]))
+            else:
+                ok.append(out)
+        ok.sort(key=lambda o: o["index"])
+        part = checkpoint.parts
+        for table, df in _frames(ok, tables).items():
+            if df is not None:
+                _write_part(df, os.path.join(out_dir, table), part, fmt)
+        if failures:
+            _append_failures(out_dir, sorted(failures))
+        checkpoint.commit(part, [o["index"] for o in ok], sorted(f[0] for f in failures))
+        totals["sites"] += len(batch)
+        totals["ok"] += len(ok)
+        totals["failed"] += len(failures)
+        totals["parts"] += 1
+        if log:
+            rate = totals["sites"] / max(1e-9, time.perf_counter() - started)
+            log(f"part {part}: {totals['sites']} sites ({totals['ok']} ok, {totals['failed']} failed), {rate:.1f} sites/s")
+    if retry_failed:
+        # retried sites that now succeed drop out; repeat failures appear once
+        _rewrite_failures(out_dir, checkpoint.failed)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m weather export", description="Fetch forecasts for a file of locations and write them in chunks.")
+    parser.add_argument("input", help="CSV with a city/name column or latitude/longitude columns")
+    parser.add_argument("out", help="output directory (also holds the checkpoint)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--tables", default=",".join(TABLES), help="comma-separated subset of: " + ", ".join(TABLES))
+    parser.add_argument("--workers", type=int, default=8, help="concurrent geocoding requests (forecast batches use half)")
+    parser.add_argument("--window", type=int, default=500, help="sites fetched and written per part file")
+    parser.add_argument("--chunk-size", type=int, default=50, help="locations per forecast request")
+    parser.add_argument("--retry-failed", action="store_true", help="on resume, try previously failed sites again")
+    args = parser.parse_args(argv)
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = set(tables) - set(TABLES)
+    if unknown or not tables:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown)) or '(none given)'}")
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    # a one-shot job never rereads a forecast; keep the shared cache to one window
+    get_forecast_cache(max_entries=args.window)
+
+    try:
+        totals = export(
+            args.input, args.out, fmt=args.format, tables=tables, workers=args.workers,
+            window=args.window, chunk_size=args.chunk_size, retry_failed=args.retry_failed, log=log,
+        )
+    except ExportError as e:
+        parser.exit(2, f"error: {e}\n")
+    except KeyboardInterrupt:
+        parser.exit(130, "interrupted; run the same command again to resume\n")
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# weather/forecast_cache.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --------------------------
+# Process-wide forecast cache with stale-while-revalidate.
+# Entries younger than `ttl` are fresh; up to `max_stale` they are still
+# served but refreshed in the background; older ones count as misses.
+# --------------------------
+FRESH = "fresh"
+STALE = "stale"
+
+
+def forecast_key(lat, lon, hourly, daily, days):
+    # ~0.01° (about 1 km) is well below the forecast model grid
+    return (round(float(lat), 2), round(float(lon), 2), hourly, daily, int(days))
+
+
+class ForecastCache:
+    def __init__(self, ttl=15 * 60, max_stale=6 * 3600, max_entries=5000, refresh_workers=2):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="forecast-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None, None
+            value, stored_at = entry
+            age = now - stored_at
+            if age > self.max_stale:
+                del self._entries[key]
+                self.stats["misses"] += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if age > self.ttl:
+                self.stats["stale_hits"] += 1
+                return value, STALE
+            self.stats["hits"] += 1
+            return value, FRESH
+
+    # look without touching stats or LRU order: (value, age in seconds)
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        return entry[0], time.time() - entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # refresh(keys) must return values aligned with keys (None = failed)
+    def refresh_async(self, keys, refresh):
+        with self._lock:
+            keys = [k for k in keys if k not in self._refreshing]
+            self._refreshing.update(keys)
+        if not keys:
+            return
+
+        def run():
+            try:
+                values = refresh(keys)
+                for key, value in zip(keys, values):
+                    if value is not None:
+                        self.put(key, value)
+                with self._lock:
+                    self.stats["refreshes"] += 1
+            except Exception:
+                with self._lock:
+                    self.stats["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(keys)
+
+        self._refresher.submit(run)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), capacity=self.max_entries)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+# max_entries resizes the shared cache (e.g. a one-shot export keeps one window)
+def get_forecast_cache(max_entries=None):
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ForecastCache() if max_entries is None else ForecastCache(max_entries=max_entries)
+        elif max_entries is not None:
+            _shared.resize(max_entries)
+        return _shared
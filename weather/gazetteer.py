@@ -0,0 +1,272 @@
+# weather/gazetteer.py
+import argparse
+import bisect
+import difflib
+import json
+import os
+import struct
+import threading
+import unicodedata
+
+import numpy as np
+
+# --------------------------
+# Offline gazetteer: a compact, population-ranked city index built from a
+# GeoNames-style TSV dump (e.g. cities500.txt) and memory-mapped at start,
+# so lookups need no parsing and no network.
+#
+# File layout: b"GAZ1" | uint32 header length | JSON header | arrays
+# (8-byte aligned). Records are stored in descending population order, so
+# a record id doubles as its popularity rank. Search keys are normalized
+# UTF-8 names sorted bytewise, each pointing back at a record id.
+# --------------------------
+MAGIC = b"GAZ1"
+GAZETTEER_PATH = os.environ.get("WEATHER_GAZETTEER", "")
+
+# GeoNames "geoname" table columns we need
+COL_NAME, COL_ASCII, COL_ALT, COL_LAT, COL_LON, COL_COUNTRY, COL_POP = 1, 2, 3, 4, 5, 8, 14
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.replace(",", " ").split())
+
+
+def _read_countries(path):
+    # GeoNames countryInfo.txt: ISO code in column 0, country name in column 4
+    names = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) > 4:
+                names[cols[0]] = cols[4]
+    return names
+
+
+def build_index(tsv_path, out_path, countries_path=None, alternate_names=False):
+    country_names = _read_countries(countries_path) if countries_path else {}
+    rows = []
+    with open(tsv_path, encoding="utf-8") as fh:
+        for line in fh:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) <= COL_POP:
+                continue
+            try:
+                lat, lon = float(cols[COL_LAT]), float(cols[COL_LON])
+            except ValueError:
+                continue
+            pop = int(cols[COL_POP]) if cols[COL_POP].isdigit() else 0
+            names = {cols[COL_NAME], cols[COL_ASCII]}
+            if alternate_names and cols[COL_ALT]:
+                names.update(cols[COL_ALT].split(","))
+            rows.append((pop, cols[COL_NAME], lat, lon, cols[COL_COUNTRY], names))
+    rows.sort(key=lambda r: -r[0])
+
+    codes = sorted({r[4] for r in rows})
+    code_idx = {c: i for i, c in enumerate(codes)}
+    n = len(rows)
+    lat = np.empty(n, dtype=np.float32)
+    lon = np.empty(n, dtype=np.float32)
+    pop = np.empty(n, dtype=np.uint32)
+    country = np.empty(n, dtype=np.uint16)
+    name_blob = bytearray()
+    name_off = np.empty(n + 1, dtype=np.uint32)
+    keys = []
+    for i, (p, name, la, lo, cc, names) in enumerate(rows):
+        lat[i], lon[i], pop[i], country[i] = la, lo, min(p, 2**32 - 1), code_idx[cc]
+        name_off[i] = len(name_blob)
+        name_blob += name.encode("utf-8")
+        for k in {normalize(x) for x in names if x}:
+            if k:
+                keys.append((k.encode("utf-8"), i))
+    name_off[n] = len(name_blob)
+    keys.sort()
+    key_blob = bytearray()
+    key_off = np.empty(len(keys) + 1, dtype=np.uint32)
+    key_rec = np.empty(len(keys), dtype=np.uint32)
+    for j, (k, i) in enumerate(keys):
+        key_off[j] = len(key_blob)
+        key_blob += k
+        key_rec[j] = i
+    key_off[len(keys)] = len(key_blob)
+
+    arrays = {
+        "lat": lat, "lon": lon, "pop": pop, "country": country,
+        "name_off": name_off, "name_blob": np.frombuffer(bytes(name_blob), dtype=np.uint8),
+        "key_off": key_off, "key_rec": key_rec, "key_blob": np.frombuffer(bytes(key_blob), dtype=np.uint8),
+    }
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = [offset, arr.dtype.str, int(arr.size)]
+        offset += (arr.nbytes + 7) // 8 * 8
+    header = json.dumps({
+        "records": n, "keys": len(keys), "arrays": layout,
+        "countries": [[c, country_names.get(c, "")] for c in codes],
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+    with open(out_path, "wb") as out:
+        out.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for arr in arrays.values():
+            raw = arr.tobytes()
+            out.write(raw + b"\0" * (-len(raw) % 8))
+    return n, len(keys)
+
+
+class _KeyView:
+    # sequence of sorted key bytes, read straight from the mapped blob
+    def __init__(self, off, blob):
+        self._off = off
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._off) - 1
+
+    def __getitem__(self, j):
+        return self._blob[self._off[j]:self._off[j + 1]].tobytes()
+
+
+class Gazetteer:
+    def __init__(self, path):
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._mm[:4].tobytes() != MAGIC:
+            raise ValueError(f"{path} is not a gazetteer index")
+        hlen = struct.unpack("<I", self._mm[4:8].tobytes())[0]
+        header = json.loads(self._mm[8:8 + hlen].tobytes())
+        base = 8 + hlen
+        for name, (offset, dtype, count) in header["arrays"].items():
+            setattr(self, name, np.frombuffer(self._mm, dtype=np.dtype(dtype), count=count, offset=base + offset))
+        self.countries = [code for code, _ in header["countries"]]
+        self.country_names = [name for _, name in header["countries"]]
+        self._country_lookup = {}
+        for i, (code, name) in enumerate(header["countries"]):
+            self._country_lookup[normalize(code)] = i
+            if name:
+                self._country_lookup[normalize(name)] = i
+        self.keys = _KeyView(self.key_off, self.key_blob)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def place(self, rec):
+        rec = int(rec)
+        c = int(self.country[rec])
+        return {
+            "name": self.name_blob[self.name_off[rec]:self.name_off[rec + 1]].tobytes().decode("utf-8"),
+            "latitude": round(float(self.lat[rec]), 5),
+            "longitude": round(float(self.lon[rec]), 5),
+            "country": self.country_names[c] or self.countries[c],
+        }
+
+    # "Berlin, Germany" / "Paris, FR" -> ("berlin", country index)
+    def _split_country(self, query):
+        head, sep, tail = query.rpartition(",")
+        if sep:
+            c = self._country_lookup.get(normalize(tail))
+            if c is not None:
+                return normalize(head), c
+        return normalize(query), None
+
+    def _key_range(self, lo_key, hi_key=None):
+        lo = bisect.bisect_left(self.keys, lo_key)
+        hi = bisect.bisect_right(self.keys, lo_key) if hi_key is None else bisect.bisect_left(self.keys, hi_key, lo)
+        return lo, hi
+
+    def _ranked(self, recs, country, limit):
+        recs = np.unique(recs)  # sorted ascending == most populous first
+        if country is not None:
+            recs = recs[self.country[recs] == country]
+        return [self.place(r) for r in recs[:limit]]
+
+    def exact(self, query, limit=5):
+        key, country = self._split_country(query)
+        if not key:
+            return []
+        lo, hi = self._key_range(key.encode("utf-8"))
+        return self._ranked(self.key_rec[lo:hi], country, limit)
+
+    def prefix(self, query, limit=10):
+        key, country = self._split_country(query)
+        if not key:
+            return []
+        k = key.encode("utf-8")
+        lo, hi = self._key_range(k, k + b"\xff")
+        return self._ranked(self.key_rec[lo:hi], country, limit)
+
+    def fuzzy(self, query, limit=5, cutoff=0.8):
+        key, country = self._split_country(query)
+        if not key:
+            return []
+        # only compare against keys of similar length
+        lengths = np.diff(self.key_off.astype(np.int64))
+        target = len(key.encode("utf-8"))
+        cand = np.nonzero(np.abs(lengths - target) <= max(2, target // 4))[0]
+        if country is not None:
+            cand = cand[self.country[self.key_rec[cand]] == country]
+        scored = []
+        matcher = difflib.SequenceMatcher(b=key)
+        for j in cand:
+            matcher.set_seq1(self.keys[j].decode("utf-8"))
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((-ratio, int(self.key_rec[j])))
+        scored.sort()
+        seen = []
+        for _, rec in scored:
+            if rec not in seen:
+                seen.append(rec)
+            if len(seen) == limit:
+                break
+        return [self.place(r) for r in seen]
+
+    # resolver for geocode_city: exact names only, a binary search. A miss
+    # goes on to the network; prefix/fuzzy are for hints and the CLI, where
+    # a near match is a suggestion rather than an answer.
+    def lookup(self, query):
+        hits = self.exact(query, limit=1)
+        return hits[0] if hits else None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_gazetteer():
+    global _shared
+    with _shared_lock:
+        if _shared is None and GAZETTEER_PATH and os.path.exists(GAZETTEER_PATH):
+            try:
+                _shared = Gazetteer(GAZETTEER_PATH)
+            except (OSError, ValueError):
+                _shared = None
+        return _shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the offline city gazetteer.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="build an index from a GeoNames TSV dump")
+    b.add_argument("tsv")
+    b.add_argument("out")
+    b.add_argument("--countries", help="GeoNames countryInfo.txt, enables 'City, Country' lookups")
+    b.add_argument("--alternate-names", action="store_true", help="also index alternate names (larger file)")
+    q = sub.add_parser("query", help="look a name up in an index")
+    q.add_argument("index")
+    q.add_argument("name")
+    q.add_argument("--mode", choices=["exact", "prefix", "fuzzy"], default="exact")
+    args = parser.parse_args(argv)
+    if args.cmd == "build":
+        n, m = build_index(args.tsv, args.out, args.countries, args.alternate_names)
+        print(f"Indexed {n} places under {m} keys -> {args.out}")
+    else:
+        gaz = Gazetteer(args.index)
+        for place in getattr(gaz, args.mode)(args.name):
+            print(f"{place['name']}\t{place['country']}\t{place['latitude']:.4f}\t{place['longitude']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# weather/geocache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --------------------------
+# Two-tier geocoding cache: in-process LRU in front of a SQLite file.
+# One instance per server process, so every Streamlit session shares it.
+# Expired rows (mostly one-off misspellings) are deleted at start and
+# every `purge_every` writes, so the file does not grow without bound.
+# --------------------------
+CACHE_DIR = os.environ.get("WEATHER_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+
+HIT_TTL = 30 * 24 * 3600   # coordinates of a city practically never change
+MISS_TTL = 6 * 3600        # misspellings: retry the providers a few times a day
+
+MISSING = object()
+
+
+def normalize_query(city):
+    return " ".join(city.casefold().replace(",", " , ").split()).replace(" ,", ",")
+
+
+class GeoCache:
+    def __init__(self, path, max_memory=2048, hit_ttl=HIT_TTL, miss_ttl=MISS_TTL, purge_every=256):
+        self.max_memory = max_memory
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS geocode_expiry ON geocode (expires_at)")
+        except sqlite3.Error:
+            # read-only or missing disk: keep working with the memory tier only
+            self._db = None
+        self.purge_expired()
+
+    def _remember(self, key, value, expires_at):
+        self._mem[key] = (value, expires_at)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_memory:
+            self._mem.popitem(last=False)
+
+    def get(self, city):
+        key = normalize_query(city)
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                if hit[1] > now:
+                    self._mem.move_to_end(key)
+                    return hit[0]
+                del self._mem[key]
+            if self._db is None:
+                return MISSING
+            try:
+                row = self._db.execute("SELECT value, expires_at FROM geocode WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                return MISSING
+            if row is None or row[1] <= now:
+                return MISSING
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            return value
+
+    def put(self, city, place):
+        key = normalize_query(city)
+        expires_at = time.time() + (self.hit_ttl if place else self.miss_ttl)
+        with self._lock:
+            self._remember(key, place, expires_at)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(place), expires_at),
+                )
+            except sqlite3.Error:
+                return
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self.purge_expired()
+
+    def purge_expired(self):
+        with self._lock:
+            if self._db is None:
+                return 0
+            try:
+                return self._db.execute("DELETE FROM geocode WHERE expires_at <= ?", (time.time(),)).rowcount
+            except sqlite3.Error:
+                return 0
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_geocache():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = GeoCache(os.path.join(CACHE_DIR, "geocode.sqlite"))
+        return _shared
@@ -0,0 +1,116 @@
+# weather/httpclient.py
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather import metrics
+
+# --------------------------
+# Shared HTTP client: one pooled keep-alive session for the whole process,
+# exponential backoff with full jitter on 429/5xx, and a per-host token
+# bucket so upstream rate limits hold across every Streamlit session.
+# --------------------------
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# host -> (requests per second, burst)
+RATE_LIMITS = {
+    "nominatim.openstreetmap.org": (1.0, 1),   # Nominatim usage policy: max 1 req/s
+    "geocoding-api.open-meteo.com": (10.0, 10),
+    "api.open-meteo.com": (10.0, 10),
+    "ipinfo.io": (2.0, 2),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # reserve a token and sleep until it is ours; callers queue up fairly
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(host):
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None and host in RATE_LIMITS:
+            bucket = _buckets[host] = TokenBucket(*RATE_LIMITS[host])
+        return bucket
+
+
+def throttle(host):
+    bucket = bucket_for(host)
+    if bucket is not None:
+        bucket.acquire()
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _retry_after(response):
+    try:
+        return min(30.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers["User-Agent"] = "weather_dashboard_app"
+            _session = s
+        return _session
+
+
+def get(url, params=None, timeout=10, retries=3):
+    host = urlsplit(url).hostname or ""
+    session = get_session()
+    for attempt in range(retries + 1):
+        throttle(host)
+        try:
+            r = session.get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.incr("weather_upstream_failures_total", host=host, reason=type(e).__name__)
+            if attempt == retries:
+                raise
+            metrics.incr("weather_upstream_retries_total", host=host)
+            time.sleep(backoff_delay(attempt))
+            continue
+        if r.status_code >= 400:
+            metrics.incr("weather_upstream_failures_total", host=host, reason=str(r.status_code))
+        if r.status_code not in RETRY_STATUS or attempt == retries:
+            return r
+        metrics.incr("weather_upstream_retries_total", host=host)
+        delay = _retry_after(r)
+        time.sleep(delay if delay is not None else backoff_delay(attempt))
+    return r
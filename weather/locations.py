@@ -0,0 +1,88 @@
+# weather/locations.py
+import csv
+import io
+import itertools
+
+from weather.api import valid_latlon
+
+# --------------------------
+# Bulk input: read a CSV of city names or coordinates as query strings
+# the pipeline understands ("Berlin", "Berlin, Germany", "52.52,13.40").
+# Rows are yielded one at a time, so huge files are never held in full.
+# --------------------------
+NAME_COLUMNS = ("city", "name", "location", "query")
+LAT_COLUMNS = ("latitude", "lat")
+LON_COLUMNS = ("longitude", "lon", "lng")
+COUNTRY_COLUMNS = ("country", "country_code", "countrycode")
+
+
+def _pick(fields, candidates):
+    lowered = {f.strip().lower(): f for f in fields if f}
+    for c in candidates:
+        if c in lowered:
+            return lowered[c]
+    return None
+
+
+def _coords(row):
+    # "lat,lon" when the first two cells are numbers, else None
+    try:
+        lat, lon = float(row[0]), float(row[1])
+    except (ValueError, IndexError):
+        return None
+    return f"{lat},{lon}"
+
+
+def read_locations(source):
+    # accepts a path, a text stream, or a binary upload (e.g. st.file_uploader)
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8") as fh:
+            yield from read_locations(fh)
+        return
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield from read_locations(text)
+        finally:
+            text.detach()  # leave the caller's stream open
+        return
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return
+    name_col = _pick(header, NAME_COLUMNS)
+    lat_col = _pick(header, LAT_COLUMNS)
+    lon_col = _pick(header, LON_COLUMNS)
+    if lat_col is None and name_col is None:
+        # no recognizable header: rows starting with two numbers are
+        # coordinates (out-of-range ones are reported by the pipeline),
+        # anything else is a name in the first column
+        for row in itertools.chain([header], reader):
+            coords = _coords(row)
+            if coords:
+                yield coords
+            elif row and row[0].strip():
+                yield row[0].strip()
+        return
+    country_col = _pick(header, COUNTRY_COLUMNS)
+    pos = {name: i for i, name in enumerate(header)}
+    for row in reader:
+        coords = None
+        if lat_col is not None and lon_col is not None:
+            try:
+                lat = float(row[pos[lat_col]])
+                lon = float(row[pos[lon_col]])
+                coords = f"{lat},{lon}"
+                if valid_latlon(lat, lon):
+                    yield coords
+                    continue
+            except (ValueError, IndexError):
+                pass
+        if name_col is not None and pos[name_col] < len(row) and row[pos[name_col]].strip():
+            name = row[pos[name_col]].strip()
+            # "Paris, FR": the country disambiguates in the gazetteer and geocoder
+            country = row[pos[country_col]].strip() if country_col is not None and pos[country_col] < len(row) else ""
+            yield f"{name}, {country}" if country else name
+        elif coords:
+            # out of range and nothing else to go on: let the pipeline report it
+            yield coords
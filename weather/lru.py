@@ -0,0 +1,65 @@
+# weather/lru.py
+import contextlib
+import threading
+from collections import OrderedDict
+
+from weather import metrics
+
+# --------------------------
+# Bounded, thread-safe LRU for the process-wide render caches (view
+# frames, chart PNGs, map HTML). Bounded by entry count and, when `sizeof`
+# is given, by the summed size of the values. `name` labels the
+# weather_cache_hits/misses_total counters; `span` names the timing span
+# around each build. Builds run outside the lock, so a slow build never
+# blocks readers of other keys.
+# --------------------------
+_NO_SPAN = contextlib.nullcontext()
+
+
+class LRUCache:
+    def __init__(self, max_entries, max_bytes=None, sizeof=None, name=None, span=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.name = name
+        self.span = span
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "builds": 0, "evictions": 0}
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                if self.name:
+                    metrics.incr("weather_cache_hits_total", cache=self.name)
+                return value
+        if self.name:
+            metrics.incr("weather_cache_misses_total", cache=self.name)
+        with metrics.span(self.span) if self.span else _NO_SPAN:
+            value = build()
+        with self._lock:
+            self.stats["builds"] += 1
+            if key not in self._items:
+                self._items[key] = value
+                self._bytes += self.sizeof(value) if self.sizeof else 0
+            while self._items and (len(self._items) > self.max_entries or self._over_bytes()):
+                _, old = self._items.popitem(last=False)
+                self._bytes -= self.sizeof(old) if self.sizeof else 0
+                self.stats["evictions"] += 1
+        return value
+
+    def _over_bytes(self):
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._items), bytes=self._bytes)
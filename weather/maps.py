@@ -0,0 +1,69 @@
+# weather/maps.py
+import hashlib
+import html
+
+from weather.lru import LRUCache
+
+# --------------------------
+# Map rendering: the folium map for a result set is built once, turned
+# into a standalone HTML document and cached by a digest of the set. Big
+# sets switch to FastMarkerCluster, which ships the points as one JS array
+# and builds markers client-side instead of one folium.Marker each.
+# folium is imported on the first build, not with the page.
+# --------------------------
+CLUSTER_THRESHOLD = 100
+
+# runs in the browser for every point of a FastMarkerCluster
+_CLUSTER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2], {maxWidth: 250});
+    marker.bindTooltip(row[3]);
+    return marker;
+};
+"""
+
+
+map_cache = LRUCache(32, name="map", span="render.map")
+
+
+def map_key(results):
+    h = hashlib.blake2b(digest_size=12)
+    for r in results:
+        h.update(f"{r['view']['key']}|{r['view']['version']}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _popup(v):
+    return f"<b>{html.escape(str(v['name']))}</b><br>Temp: {v['temperature']}°C<br>Wind: {v['windspeed']} m/s"
+
+
+def build_map(results, cluster_threshold=CLUSTER_THRESHOLD):
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    # Build a combined map centered on average coords
+    try:
+        avg_lat = sum([r["place"]["latitude"] for r in results]) / len(results)
+        avg_lon = sum([r["place"]["longitude"] for r in results]) / len(results)
+    except Exception:
+        avg_lat, avg_lon = 0, 0
+    fmap = folium.Map(location=[avg_lat, avg_lon], zoom_start=3, tiles="CartoDB positron")
+    if len(results) > cluster_threshold:
+        points = [[r["place"]["latitude"], r["place"]["longitude"], _popup(r["view"]), html.escape(str(r["view"]["name"]))] for r in results]
+        FastMarkerCluster(points, callback=_CLUSTER_CALLBACK).add_to(fmap)
+    else:
+        for r in results:
+            try:
+                popup = folium.Popup(_popup(r["view"]), max_width=250)
+                folium.Marker([r["place"]["latitude"], r["place"]["longitude"]], popup=popup, tooltip=html.escape(str(r["view"]["name"]))).add_to(fmap)
+            except Exception:
+                pass
+    return fmap
+
+
+def map_html(results, cluster_threshold=CLUSTER_THRESHOLD):
+    return map_cache.get_or_build(
+        (map_key(results), len(results) > cluster_threshold),
+        lambda: build_map(results, cluster_threshold).get_root().render(),
+    )
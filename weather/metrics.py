@@ -0,0 +1,201 @@
+# weather/metrics.py
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------------------------
+# Lightweight instrumentation: timing spans, counters and latency
+# histograms for the weather pipeline, exported in Prometheus text format.
+# Off by default; when disabled, span() hands back one shared no-op
+# context manager and incr() returns on its first line.
+# --------------------------
+ENABLED = os.environ.get("WEATHER_METRICS", "") not in ("", "0", "false")
+# the page's debug panel flips collection for the whole process, so it
+# is only shown when the operator opts in; there is no per-visitor switch
+PANEL = os.environ.get("WEATHER_METRICS_PANEL", "") not in ("", "0", "false")
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # stage -> [bucket counts..., +Inf count, sum]
+
+
+def set_enabled(on):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def incr(name, n=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(stage, seconds):
+    if not ENABLED:
+        return
+    with _lock:
+        h = _histograms.get(stage)
+        if h is None:
+            h = _histograms[stage] = [0] * (len(BUCKETS) + 1) + [0.0]
+        h[bisect.bisect_left(BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            incr("weather_stage_errors_total", stage=self.stage)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage):
+    return _Span(stage) if ENABLED else _NOOP
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+# --------------------------
+# Read-outs: a summary for the debug panel and Prometheus text
+# --------------------------
+def _quantile(h, q):
+    total = sum(h[:-1])
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(h[:-1]):
+        seen += count
+        if seen >= rank:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return None
+
+
+def summary():
+    with _lock:
+        stages = {}
+        for stage, h in sorted(_histograms.items()):
+            count = sum(h[:-1])
+            p95 = _quantile(h, 0.95)
+            stages[stage] = {
+                "count": count,
+                "avg_ms": round(1000 * h[-1] / max(1, count), 2),
+                # upper bound of the bucket holding the 95th percentile
+                "p95_le_ms": None if p95 is None else round(1000 * p95, 1),
+            }
+        counters = {
+            name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+            for (name, labels), value in sorted(_counters.items())
+        }
+    return {"stages": stages, "counters": counters}
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        names = sorted({name for name, _ in _counters})
+        for name in names:
+            lines.append(f"# TYPE {name} counter")
+            for (n, labels), value in sorted(_counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_fmt_labels(labels)} {value}")
+        if _histograms:
+            lines.append("# TYPE weather_stage_seconds histogram")
+        for stage, h in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), h[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"weather_stage_seconds_bucket{_fmt_labels((('stage', stage),), (('le', le),))} {cumulative}")
+            lines.append(f"weather_stage_seconds_sum{_fmt_labels((('stage', stage),))} {h[-1]:.6f}")
+            lines.append(f"weather_stage_seconds_count{_fmt_labels((('stage', stage),))} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        fh.write(prometheus_text())
+    os.replace(tmp, path)
+
+# --------------------------
+# Optional exporters: a file rewritten every few seconds (for node
+# exporter's textfile collector) and/or a tiny /metrics endpoint
+# --------------------------
+_exporters_started = False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200 if self.path.startswith("/metrics") else 404)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_exporters(path=None, port=None, interval=15):
+    global _exporters_started
+    path = path or os.environ.get("WEATHER_METRICS_FILE")
+    port = port or os.environ.get("WEATHER_METRICS_PORT")
+    with _lock:
+        if _exporters_started or not ENABLED:
+            return
+        _exporters_started = True
+    if path:
+        def loop():
+            while True:
+                try:
+                    write_prometheus(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+        threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
@@ -0,0 +1,90 @@
+# weather/pipeline.py
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from weather.api import fetch_forecasts, geocode_city, parse_latlon, split_latlon
+
+# --------------------------
+# One city: resolve its coordinates
+# --------------------------
+def resolve_city(city):
+    if split_latlon(city) is not None:
+        # coordinates are never geocoded; out-of-range ones are unlocatable
+        return parse_latlon(city)
+    return geocode_city(city)
+
+# --------------------------
+# Many cities, streamed: geocode concurrently and yield each city as soon
+# as its forecast lands. Located places are batched into forecast
+# requests of up to `chunk_size`; a batch is sent as soon as it is full or
+# the forecast side is idle, so the first cards appear quickly while
+# large lists still travel in few round trips. Upstream pacing is left to
+# the shared rate limiters in weather.httpclient.
+#
+# Yields {"index", "query", "place", "data"} or {"index", "query", "error"}.
+# --------------------------
+def iter_fetch_cities(cities, max_workers=8, chunk_size=50):
+    cities = list(cities)
+    if not cities:
+        return
+    # separate pools, so forecast batches never queue behind geocoding
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, max_workers // 2))
+    finished = False
+    try:
+        geocoding = {pool.submit(resolve_city, city): i for i, city in enumerate(cities)}
+        fetching = {}
+        pending = []
+
+        def flush():
+            batch = pending[:chunk_size]
+            del pending[:chunk_size]
+            fut = fetch_pool.submit(fetch_forecasts, [place for _, place in batch], 7, chunk_size)
+            fetching[fut] = batch
+
+        while geocoding or fetching or pending:
+            while pending and (len(pending) >= chunk_size or not geocoding or not fetching):
+                flush()
+            done, _ = wait(list(geocoding) + list(fetching), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in geocoding:
+                    i = geocoding.pop(fut)
+                    try:
+                        place = fut.result()
+                    except Exception:
+                        place = None
+                    if place:
+                        pending.append((i, place))
+                    else:
+                        yield {"index": i, "query": cities[i], "error": f"Could not locate: {cities[i]}"}
+                    continue
+                batch = fetching.pop(fut)
+                try:
+                    forecasts = fut.result()
+                except Exception:
+                    forecasts = [None] * len(batch)
+                for (i, place), data in zip(batch, forecasts):
+                    if data:
+                        yield {"index": i, "query": cities[i], "place": place, "data": data}
+                    else:
+                        yield {"index": i, "query": cities[i], "error": f"Could not fetch weather for: {cities[i]}"}
+        finished = True
+    finally:
+        # closed early (a rerun, Ctrl-C): drop queued work instead of
+        # waiting for every remaining city; running requests finish alone
+        pool.shutdown(wait=finished, cancel_futures=not finished)
+        fetch_pool.shutdown(wait=finished, cancel_futures=not finished)
+
+# --------------------------
+# Many cities, all at once: same pipeline, results back in input order
+# --------------------------
+def fetch_cities(cities, max_workers=8, chunk_size=50):
+    results = []
+    failed = []
+    errors = []
+    for out in sorted(iter_fetch_cities(cities, max_workers, chunk_size), key=lambda o: o["index"]):
+        if "error" in out:
+            failed.append(out["query"])
+            errors.append(out["error"])
+        else:
+            results.append({"query": out["query"], "place": out["place"], "data": out["data"]})
+    return results, failed, errors
@@ -0,0 +1,176 @@
+# weather/scheduler.py
+import atexit
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from weather.api import chunked, fetch_open_meteo_chunk, forecast_cache_key
+from weather.forecast_cache import get_forecast_cache
+
+# --------------------------
+# Background refresh for watched locations. Places that users fetch go on
+# a watchlist; shortly after each upstream model update the scheduler
+# re-fetches only the watched forecasts that are stale (or about to be)
+# and writes them into the shared forecast cache. Sessions notice the
+# bumped `generation` and swap the fresh data in without a spinner.
+# --------------------------
+UPDATE_MINUTE = 5          # Open-Meteo publishes model runs on the hour; give it a few minutes
+MAX_WATCHED = 500
+FORGET_AFTER = 24 * 3600   # drop places nobody asked for in a day
+
+
+class RefreshScheduler:
+    def __init__(self, max_watched=MAX_WATCHED, workers=2, chunk_size=50, jitter=90.0, update_minute=UPDATE_MINUTE):
+        self.max_watched = max_watched
+        self.chunk_size = chunk_size
+        self.jitter = jitter
+        self.update_minute = update_minute
+        self.generation = 0
+        self.stats = {"runs": 0, "refreshed": 0, "failed": 0}
+        self._watch = {}  # cache key -> [place, hits, last requested]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast-scheduler")
+        self._thread = None
+
+    def watch(self, places):
+        now = time.time()
+        with self._lock:
+            for place in places:
+                key = forecast_cache_key(place)
+                entry = self._watch.setdefault(key, [place, 0, now])
+                entry[1] += 1
+                entry[2] = now
+            if len(self._watch) > self.max_watched:
+                # keep the most requested places
+                keep = sorted(self._watch.items(), key=lambda kv: (kv[1][1], kv[1][2]), reverse=True)[:self.max_watched]
+                self._watch = dict(keep)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def seconds_until_next_run(self, now=None):
+        now = now or time.time()
+        hour = now - now % 3600
+        due = hour + self.update_minute * 60
+        if due <= now:
+            due += 3600
+        # jitter spreads servers (and restarts) so refreshes do not line up
+        return due - now + random.uniform(0, self.jitter)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.seconds_until_next_run())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.run_once()
+            except Exception:
+                with self._lock:
+                    self.stats["failed"] += 1
+
+    def _due(self):
+        cache = get_forecast_cache()
+        now = time.time()
+        due = []
+        with self._lock:
+            for key, (place, _, last) in list(self._watch.items()):
+                if now - last > FORGET_AFTER:
+                    del self._watch[key]
+                    continue
+                _, age = cache.peek(key)
+                # refetch only what is stale or will be before the next run
+                if age is None or age > cache.ttl * 0.8:
+                    due.append((key, place))
+        return due
+
+    def run_once(self):
+        due = self._due()
+        with self._lock:
+            self.stats["runs"] += 1
+        if not due:
+            return 0
+        cache = get_forecast_cache()
+
+        def refresh(batch):
+            forecasts = fetch_open_meteo_chunk([place for _, place in batch], days=7)
+            ok = 0
+            for (key, _), data in zip(batch, forecasts):
+                if data is not None:
+                    cache.put(key, data)
+                    ok += 1
+            return ok, len(batch) - ok
+
+        futures = []
+        for batch in chunked(due, self.chunk_size):
+            if self._stop.is_set():
+                break
+            futures.append(self._pool.submit(refresh, batch))
+            time.sleep(random.uniform(0, 0.5))  # small spread between batches
+        refreshed = failed = 0
+        for fut in futures:
+            try:
+                ok, bad = fut.result()
+            except Exception:
+                ok, bad = 0, 0
+            refreshed += ok
+            failed += bad
+        with self._lock:
+            self.stats["refreshed"] += refreshed
+            self.stats["failed"] += failed
+            if refreshed:
+                self.generation += 1
+        return refreshed
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, watched=len(self._watch), generation=self.generation)
+
+
+# --------------------------
+# Swap fresher cached forecasts into a session's results. Only the
+# shared cache is read (no network); returns None when nothing changed.
+# --------------------------
+def refreshed_results(results):
+    from weather.viewmodel import build_view  # pandas-backed; not needed at startup
+
+    cache = get_forecast_cache()
+    changed = False
+    out = []
+    for r in results:
+        data, _ = cache.peek(forecast_cache_key(r["place"]))
+        if data is not None:
+            view = build_view({"place": r["place"], "data": data})
+            if view["version"] != r["view"]["version"]:
+                r = {"query": r["query"], "place": r["place"], "data": data, "view": view}
+                changed = True
+        out.append(r)
+    return out if changed else None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RefreshScheduler().start()
+            # the Streamlit server exits through the interpreter's shutdown
+            atexit.register(_shared.stop)
+        return _shared
@@ -0,0 +1,58 @@
+# weather/singleflight.py
+import threading
+from concurrent.futures import Future
+
+# --------------------------
+# Request coalescing: concurrent callers asking for the same key share a
+# single in-flight call (and its result or exception). Works across the
+# script threads of every Streamlit session in this process.
+# --------------------------
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    # returns (future, is_leader); the leader must call finish() or fail()
+    # with that future
+    def begin(self, key):
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.stats["followers"] += 1
+                return fut, False
+            fut = Future()
+            self._inflight[key] = fut
+            self.stats["leaders"] += 1
+            return fut, True
+
+    def _release(self, key, fut):
+        with self._lock:
+            if self._inflight.get(key) is not fut or fut.done():
+                return False
+            del self._inflight[key]
+            return True
+
+    def finish(self, key, fut, value):
+        if self._release(key, fut):
+            fut.set_result(value)
+
+    def fail(self, key, fut, error):
+        if self._release(key, fut):
+            fut.set_exception(error)
+
+    def do(self, key, fn):
+        fut, leader = self.begin(key)
+        if not leader:
+            return fut.result()
+        try:
+            value = fn()
+        except BaseException as e:
+            self.fail(key, fut, e)
+            raise
+        self.finish(key, fut, value)
+        return value
+
+
+geocode_flight = SingleFlight()
+forecast_flight = SingleFlight()
@@ -0,0 +1,202 @@
+# weather/store.py
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# Compact columnar forecast store: every city of a result set lives in a
+# few contiguous arrays (float32 values, int8 weather codes, int32 second
+# offsets from one epoch base) instead of per-city DataFrames. Each city is
+# exposed as a zero-copy view that still answers data["current"],
+# data["hourly"] and data["daily"] like the fetch layer does.
+# --------------------------
+HOURLY_FIELDS = ("temperature_2m", "relativehumidity_2m", "windspeed_10m")
+DAILY_FIELDS = ("temperature_2m_max", "temperature_2m_min", "precipitation_sum")
+CURRENT_FIELDS = ("temperature", "windspeed")
+NO_CODE = -1
+
+
+def _seconds(values):
+    return np.asarray(pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[s]"))
+
+
+class ForecastStore:
+    def __init__(self, base, arrays):
+        self.base = base  # numpy datetime64[s]; all times are int32 offsets from it
+        for name, arr in arrays.items():
+            arr.flags.writeable = False  # safe to share between sessions
+            setattr(self, name, arr)
+        self._digest = None
+
+    @classmethod
+    def from_forecasts(cls, forecasts):
+        n = len(forecasts)
+        hourly = [f.get("hourly") for f in forecasts]
+        daily = [f.get("daily") for f in forecasts]
+        hourly = [h if h is not None and not h.empty else None for h in hourly]
+        daily = [d if d is not None and not d.empty else None for d in daily]
+        n_hours = max([len(h) for h in hourly if h is not None] or [0])
+        n_days = max([len(d) for d in daily if d is not None] or [0])
+
+        # shared epoch base: the earliest timestamp anywhere in the set
+        stamps = {}
+        for i, f in enumerate(forecasts):
+            if hourly[i] is not None and "time" in hourly[i].columns:
+                stamps[("h", i)] = _seconds(hourly[i]["time"])
+            if daily[i] is not None and "time" in daily[i].columns:
+                stamps[("d", i)] = _seconds(daily[i]["time"])
+            if f.get("current", {}).get("time"):
+                stamps[("c", i)] = _seconds([f["current"]["time"]])
+        base = min((s.min() for s in stamps.values() if len(s)), default=np.datetime64(0, "s"))
+
+        a = {
+            "hourly": np.full((len(HOURLY_FIELDS), n, n_hours), np.nan, dtype=np.float32),
+            "hourly_code": np.full((n, n_hours), NO_CODE, dtype=np.int8),
+            "hourly_time": np.zeros((n, n_hours), dtype=np.int32),
+            "hourly_len": np.zeros(n, dtype=np.int16),
+            "daily": np.full((len(DAILY_FIELDS), n, n_days), np.nan, dtype=np.float32),
+            "daily_code": np.full((n, n_days), NO_CODE, dtype=np.int8),
+            "daily_time": np.zeros((n, n_days), dtype=np.int32),
+            "daily_len": np.zeros(n, dtype=np.int16),
+            "current": np.full((len(CURRENT_FIELDS), n), np.nan, dtype=np.float32),
+            "current_code": np.full(n, NO_CODE, dtype=np.int8),
+            "current_time": np.full(n, -1, dtype=np.int32),
+        }
+        for i, f in enumerate(forecasts):
+            h = hourly[i]
+            if h is not None:
+                k = len(h)
+                a["hourly_len"][i] = k
+                for j, field in enumerate(HOURLY_FIELDS):
+                    if field in h.columns:
+                        a["hourly"][j, i, :k] = h[field].to_numpy(dtype=np.float32, na_value=np.nan)
+                if "weathercode" in h.columns:
+                    a["hourly_code"][i, :k] = h["weathercode"].fillna(NO_CODE).to_numpy(dtype=np.int8)
+                if ("h", i) in stamps:
+                    a["hourly_time"][i, :k] = (stamps[("h", i)] - base).astype(np.int32)
+            d = daily[i]
+            if d is not None:
+                k = len(d)
+                a["daily_len"][i] = k
+                for j, field in enumerate(DAILY_FIELDS):
+                    if field in d.columns:
+                        a["daily"][j, i, :k] = d[field].to_numpy(dtype=np.float32, na_value=np.nan)
+                if "weathercode" in d.columns:
+                    a["daily_code"][i, :k] = d["weathercode"].fillna(NO_CODE).to_numpy(dtype=np.int8)
+                if ("d", i) in stamps:
+                    a["daily_time"][i, :k] = (stamps[("d", i)] - base).astype(np.int32)
+            cur = f.get("current", {}) or {}
+            for j, field in enumerate(CURRENT_FIELDS):
+                if cur.get(field) is not None:
+                    a["current"][j, i] = cur[field]
+            if cur.get("weathercode") is not None:
+                a["current_code"][i] = int(cur["weathercode"])
+            if ("c", i) in stamps:
+                a["current_time"][i] = int((stamps[("c", i)][0] - base).astype(np.int64))
+        return cls(base, a)
+
+    def __len__(self):
+        return len(self.hourly_len)
+
+    def _arrays(self):
+        return [v for v in vars(self).values() if isinstance(v, np.ndarray)]
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self._arrays())
+
+    def digest(self):
+        if self._digest is None:
+            h = hashlib.blake2b(str(self.base).encode(), digest_size=16)
+            for arr in self._arrays():
+                h.update(arr.tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def city(self, i):
+        return CityForecast(self, i)
+
+
+class CityForecast:
+    # read-only view of one row of a ForecastStore
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def _times(self, offsets):
+        return self.store.base + offsets.astype("timedelta64[s]")
+
+    @property
+    def current(self):
+        s, i = self.store, self.row
+        cur = {}
+        for j, field in enumerate(CURRENT_FIELDS):
+            if not np.isnan(s.current[j, i]):
+                cur[field] = round(float(s.current[j, i]), 2)
+        if s.current_code[i] != NO_CODE:
+            cur["weathercode"] = int(s.current_code[i])
+        if s.current_time[i] >= 0:
+            cur["time"] = str(self._times(s.current_time[i:i + 1])[0])[:16]
+        return cur
+
+    def hourly_values(self, field):
+        s, i = self.store, self.row
+        return s.hourly[HOURLY_FIELDS.index(field), i, :s.hourly_len[i]]
+
+    def daily_values(self, field):
+        s, i = self.store, self.row
+        return s.daily[DAILY_FIELDS.index(field), i, :s.daily_len[i]]
+
+    @property
+    def hourly(self):
+        s, i = self.store, self.row
+        k = int(s.hourly_len[i])
+        if not k:
+            return pd.DataFrame()
+        cols = {"time": self._times(s.hourly_time[i, :k])}
+        cols.update({field: self.hourly_values(field) for field in HOURLY_FIELDS})
+        cols["weathercode"] = s.hourly_code[i, :k]
+        return pd.DataFrame(cols, copy=False)
+
+    @property
+    def daily(self):
+        s, i = self.store, self.row
+        k = int(s.daily_len[i])
+        if not k:
+            return pd.DataFrame()
+        cols = {"time": pd.Series(self._times(s.daily_time[i, :k])).dt.date}
+        cols.update({field: self.daily_values(field) for field in DAILY_FIELDS})
+        cols["weathercode"] = s.daily_code[i, :k]
+        return pd.DataFrame(cols, copy=False)
+
+    # dict-style access, so callers written for the fetch layer keep working
+    def __getitem__(self, key):
+        if key in ("current", "hourly", "daily"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+# --------------------------
+# Sessions holding identical data share one read-only store
+# --------------------------
+_shared = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def share_store(store):
+    with _shared_lock:
+        existing = _shared.get(store.digest())
+        if existing is not None:
+            return existing
+        _shared[store.digest()] = store
+        return store
@@ -0,0 +1,216 @@
+# weather/tts.py
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from weather import metrics
+from weather.geocache import CACHE_DIR
+from weather.singleflight import SingleFlight
+
+# --------------------------
+# Content-addressed text-to-speech cache: clips are keyed by a hash of
+# (lang, text), kept in a byte-bounded in-memory LRU and mirrored to
+# disk, so a sentence is synthesized once per server, not once per click.
+# The disk copy is bounded too: every `prune_every` writes (and once at
+# start) clips older than `max_age` go, then the least recently used
+# ones (by mtime, refreshed on disk hits) until under `max_disk_bytes`.
+# --------------------------
+def synthesize_gtts(text, lang="en"):
+    from gtts import gTTS  # loaded the first time a clip is actually synthesized
+
+    tts = gTTS(text=text, lang=lang)
+    buf = BytesIO()
+    tts.write_to_fp(buf)
+    return buf.getvalue()
+
+
+def clip_key(text, lang="en"):
+    return hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, directory, synthesize=synthesize_gtts, max_memory_bytes=32 * 1024 * 1024, workers=2,
+                 max_disk_bytes=256 * 1024 * 1024, max_age=30 * 24 * 3600, prune_every=64):
+        self.directory = directory
+        self.synthesize = synthesize
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._mem = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._writes = 0
+        self._flight = SingleFlight()
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-pregen")
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "synthesized": 0, "errors": 0, "pruned": 0}
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            self.directory = None
+        if self.directory:
+            self._workers.submit(self.prune)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".mp3")
+
+    def _remember(self, key, audio):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return
+            self._mem[key] = audio
+            self._bytes += len(audio)
+            while self._mem and self._bytes > self.max_memory_bytes:
+                _, old = self._mem.popitem(last=False)
+                self._bytes -= len(old)
+
+    def cached(self, text, lang="en"):
+        key = clip_key(text, lang)
+        with self._lock:
+            audio = self._mem.get(key)
+            if audio is not None:
+                self._mem.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                metrics.incr("weather_cache_hits_total", cache="tts")
+                return audio
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as fh:
+                    audio = fh.read()
+                os.utime(path)  # recently used: pruned last
+            except OSError:
+                return None
+            self._remember(key, audio)
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            metrics.incr("weather_cache_hits_total", cache="tts_disk")
+            return audio
+        return None
+
+    def _store(self, key, audio):
+        self._remember(key, audio)
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write-then-rename so readers never see a half-written clip
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(audio)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self._workers.submit(self.prune)
+
+    def prune(self):
+        if not self.directory or not self._prune_lock.acquire(blocking=False):
+            return 0  # another prune is already running
+        try:
+            files = []
+            for sub in os.scandir(self.directory):
+                if sub.is_dir():
+                    for entry in os.scandir(sub.path):
+                        try:
+                            info = entry.stat()
+                        except OSError:
+                            continue
+                        files.append((info.st_mtime, info.st_size, entry.path))
+            files.sort()  # oldest first
+            total = sum(size for _, size, _ in files)
+            cutoff = time.time() - self.max_age
+            removed = 0
+            for mtime, size, path in files:
+                if mtime >= cutoff and total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            with self._lock:
+                self.stats["pruned"] += removed
+            return removed
+        except OSError:
+            return 0
+        finally:
+            self._prune_lock.release()
+
+    def get(self, text, lang="en"):
+        audio = self.cached(text, lang)
+        if audio is not None:
+            return audio
+        key = clip_key(text, lang)
+
+        def synth():
+            with metrics.span("tts.synthesize"):
+                audio = self.synthesize(text, lang)
+            self._store(key, audio)
+            with self._lock:
+                self.stats["synthesized"] += 1
+            return audio
+
+        return self._flight.do(key, synth)
+
+    def pregenerate(self, texts, lang="en"):
+        for text in texts:
+            if self.cached(text, lang) is None:
+                self._workers.submit(self._pregenerate_one, text, lang)
+
+    def _pregenerate_one(self, text, lang):
+        try:
+            self.get(text, lang)
+        except Exception:
+            metrics.incr("weather_stage_failures_total", stage="tts.synthesize")
+            with self._lock:
+                self.stats["errors"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._mem), bytes=self._bytes)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_tts_cache():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TTSCache(os.path.join(CACHE_DIR, "tts"))
+        return _shared
+
+# --------------------------
+# Helper: Text to audio returns audio bytes (None on failure)
+# --------------------------
+def tts_bytes(text, lang="en"):
+    try:
+        return get_tts_cache().get(text, lang)
+    except Exception:
+        metrics.incr("weather_stage_failures_total", stage="tts.synthesize")
+        return None
+
+# --------------------------
+# Helper: one clip for many sentences. MP3 frames can simply be
+# concatenated, so cached per-city clips are joined instead of
+# synthesizing one long string.
+# --------------------------
+def joined_tts_bytes(texts, lang="en"):
+    clips = [tts_bytes(text, lang) for text in texts]
+    if not clips or any(c is None for c in clips):
+        return None
+    return b"".join(clips)
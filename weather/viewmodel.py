@@ -0,0 +1,159 @@
+# weather/viewmodel.py
+import hashlib
+
+import pandas as pd
+
+from weather.lru import LRUCache
+
+# --------------------------
+# Ready-to-render view model, built once when a fetch completes so that
+# widget reruns only read from st.session_state and shared caches.
+# --------------------------
+ICON_MAP = {
+    # mapping Open-Meteo weathercode groups to simple gif or emoji as fallback
+    "clear": "☀️",
+    "partly_cloudy": "⛅",
+    "cloudy": "☁️",
+    "fog": "🌫️",
+    "rain": "🌧️",
+    "drizzle": "🌦️",
+    "snow": "❄️",
+    "thunder": "⛈️",
+    "unknown": "🌈"
+}
+
+HOURLY_COLUMNS = ["time", "temperature_2m", "relativehumidity_2m", "windspeed_10m", "weathercode"]
+
+DAILY_RENAME = {
+    "temperature_2m_max": "Max °C",
+    "temperature_2m_min": "Min °C",
+    "precipitation_sum": "Precip (mm)",
+    "weathercode": "WCode",
+    "time": "Date",
+}
+
+
+def weathercode_to_key(code):
+    if code is None:
+        return "unknown"
+    c = int(code)
+    if c == 0:
+        return "clear"
+    if c in (1,2,3):
+        return "partly_cloudy"
+    if c in (45,48):
+        return "fog"
+    if 51 <= c <= 67 or 80 <= c <= 82 or 95 <= c <= 99 or (c >= 80 and c <= 99):
+        return "rain"
+    if 71 <= c <= 77:
+        return "snow"
+    if 95 <= c <= 99:
+        return "thunder"
+    return "cloudy"
+
+
+def _closest_humidity(hourly, when):
+    # hourly["time"] is sorted, so a binary search replaces the full scan
+    if hourly.empty or "relativehumidity_2m" not in hourly.columns or when is None:
+        return None
+    try:
+        times = hourly["time"].to_numpy()
+        target = pd.Timestamp(when).to_datetime64()
+        pos = int(times.searchsorted(target))
+        if pos >= len(times) or (pos > 0 and target - times[pos - 1] <= times[pos] - target):
+            pos -= 1
+        return hourly["relativehumidity_2m"].iat[pos]
+    except Exception:
+        return None
+
+
+def _next_hours_start(hourly):
+    if "time" not in hourly.columns:
+        return 0
+    try:
+        times = hourly["time"]
+        return int(times.searchsorted(pd.Timestamp.now(tz=times.dt.tz)))
+    except Exception:
+        return 0
+
+
+def _data_version(name, cur, hourly, daily):
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr((name, cur.get("time"), cur.get("temperature"), cur.get("windspeed"))).encode())
+    for frame in (hourly, daily):
+        if frame is not None and not frame.empty:
+            h.update(frame.select_dtypes("number").to_numpy(dtype="float32").tobytes())
+    return h.hexdigest()
+
+# --------------------------
+# Per-city scalars kept in session state. The small display frames
+# (next 24 h, hourly table, renamed 7-day table) live in a shared,
+# bounded cache keyed by place and data version, so sessions do not each
+# hold their own copies and reruns of the same page reuse them.
+# --------------------------
+def build_view(result):
+    place = result["place"]
+    data = result["data"]
+    cur = data.get("current", {})
+    hourly = data.get("hourly", pd.DataFrame())
+    daily = data.get("daily", pd.DataFrame())
+    has_hourly = hourly is not None and not hourly.empty
+    has_daily = daily is not None and not daily.empty
+
+    view = {
+        "name": place.get("name"),
+        "country": place.get("country", ""),
+        "icon": ICON_MAP.get(weathercode_to_key(cur.get("weathercode", None)), ICON_MAP["unknown"]),
+        "temperature": cur.get("temperature", "N/A"),
+        "windspeed": cur.get("windspeed", "N/A"),
+        "humidity": _closest_humidity(hourly, cur.get("time")) if has_hourly else None,
+        "hour_start": _next_hours_start(hourly) if has_hourly else 0,
+        "has_hourly": has_hourly,
+        "has_daily": has_daily,
+    }
+    # charts and other caches key on what the data is, not who fetched it
+    view["key"] = f"{place['latitude']:.2f},{place['longitude']:.2f}"
+    view["version"] = _data_version(view["name"], cur, hourly, daily)
+    view["speak_text"] = f"Weather in {view['name']}. Temperature {cur.get('temperature','unknown')} degrees Celsius. Wind {cur.get('windspeed','unknown')} meters per second."
+    view["speak_summary"] = f"{view['name']}: {cur.get('temperature','unknown')} degree C, wind {cur.get('windspeed','unknown')} meters per second"
+    return view
+
+
+_frames = LRUCache(256, name="frames")
+
+
+def _build_frames(view, data):
+    frames = {"next24": None, "display_hour": None, "daily": None}
+    if view["has_hourly"]:
+        hourly = data.get("hourly")
+        next24 = hourly.iloc[view["hour_start"]:view["hour_start"] + 24]
+        if not next24.empty:
+            frames["next24"] = next24
+            display_hour = next24[HOURLY_COLUMNS].copy() if set(HOURLY_COLUMNS).issubset(next24.columns) else next24.head(24).copy()
+            # human-friendly
+            if "time" in display_hour.columns:
+                display_hour["time"] = display_hour["time"].dt.strftime("%Y-%m-%d %H:%M")
+            frames["display_hour"] = display_hour
+    if view["has_daily"]:
+        daily = data.get("daily")
+        disp = daily.rename(columns={k: v for k, v in DAILY_RENAME.items() if k in daily.columns})
+        if "Date" in disp.columns:
+            disp["Date"] = pd.to_datetime(disp["Date"]).dt.date
+        frames["daily"] = disp
+    return frames
+
+
+def view_frames(view, data):
+    return _frames.get_or_build((view["key"], view["version"], view["hour_start"]), lambda: _build_frames(view, data))
+
+
+def build_comparison(results):
+    return pd.DataFrame([{
+        "City": r["place"]["name"],
+        "Temperature": r["view"]["temperature"] if r["view"]["temperature"] != "N/A" else None,
+        "Wind": r["view"]["windspeed"] if r["view"]["windspeed"] != "N/A" else None
+    } for r in results])
+
+
+def comparison_version(results):
+    return hashlib.blake2b("|".join(r["view"]["version"] for r in results).encode(), digest_size=8).hexdigest()
@@ -0,0 +1,55 @@
+# weather/warmup.py
+import importlib
+import os
+import threading
+import time
+
+# --------------------------
+# Optional warm-up: the heavy libraries are imported lazily where they are
+# used, so the first render only pays for Streamlit. Once the server is up,
+# a daemon thread preloads them off the request path, so the first fetch,
+# chart, map or voice clip does not pay the import either.
+# Set WEATHER_WARMUP=0 to keep everything strictly on demand.
+# --------------------------
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "weather.viewmodel",
+    "weather.store",
+    "matplotlib.figure",
+    "folium",
+    "folium.plugins",
+    "geopy.geocoders",
+    "gtts",
+)
+
+ENABLED = os.environ.get("WEATHER_WARMUP", "1") not in ("0", "false", "")
+
+_started = False
+_lock = threading.Lock()
+timings = {}  # module -> seconds spent importing it during warm-up
+
+
+def _preload(modules):
+    from weather.charts import load_matplotlib
+
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            if name == "matplotlib.figure":
+                load_matplotlib()  # selects the Agg backend before anything draws
+            else:
+                importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = round(time.perf_counter() - start, 4)
+
+
+def warm_up(modules=HEAVY_MODULES):
+    global _started
+    with _lock:
+        if _started or not ENABLED:
+            return False
+        _started = True
+    threading.Thread(target=_preload, args=(modules,), name="weather-warmup", daemon=True).start()
+    return True